@@ -0,0 +1,80 @@
+"""Check the NumPy entity backend against the sprite classes and time both.
+
+    python -m benchmarks.batch_parity
+
+Every scenario steps a scalar and a batched world with the same random inputs
+and compares every enemy and projectile after each step; any difference fails.
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from benchmarks.levelgen import generate_level
+from src import batch
+from src.level_manager import load_level, build_level
+from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from src.simulation import World, InputState
+
+FRAMES = 2000
+
+def scenarios():
+    for number in range(1, 6):
+        yield f'level {number}', lambda number=number: load_level(number)
+    for enemies in (1000, 5000):
+        level = generate_level(platforms=400, enemies=enemies, coins=200, seed=enemies, width=WINDOW_WIDTH * 6)
+        yield f'{enemies} enemies', lambda level=level: build_level(level)
+    level = generate_level(platforms=2000, enemies=2000, coins=2000, seed=1)
+    yield 'streamed', lambda: build_level(level)
+
+def state(world):
+    player = world.player
+    return (
+        tuple(player.rect), player.lives, player.coins,
+        [(tuple(e.rect), e.direction, e.facing_right, e.frame_index, e.image) for e in world.enemies],
+        [tuple(p.rect) for p in world.projectiles]
+    )
+
+def run(make_level, frames, seed=0):
+    """Step both backends side by side; returns (first differing frame or None, scalar s, batched s)"""
+    worlds = [World(make_level(), batched=False), World(make_level(), batched=True)]
+    elapsed = [0.0, 0.0]
+    rng = random.Random(seed)
+    left = right = False
+    for frame in range(frames):
+        if frame % 30 == 0:
+            choice = rng.random()
+            right, left = choice < 0.7, choice > 0.85
+        inputs = InputState(left, right, rng.random() < 0.05, rng.random() < 0.1)
+        for i, world in enumerate(worlds):
+            start = time.perf_counter()
+            world.step(inputs)
+            elapsed[i] += time.perf_counter() - start
+        if frame == frames // 2:
+            for world in worlds:
+                world.restart()
+        if state(worlds[0]) != state(worlds[1]):
+            return frame, elapsed[0], elapsed[1]
+    return None, elapsed[0], elapsed[1]
+
+def main():
+    if not batch.available():
+        print('numpy is not installed; the batched backend is unavailable')
+        return 1
+    pygame.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    print(f"{'scenario':<14} {'parity':>8} {'scalar ms/step':>15} {'batched ms/step':>16}")
+    failed = False
+    for name, make_level in scenarios():
+        mismatch, scalar, batched = run(make_level, FRAMES)
+        failed = failed or mismatch is not None
+        parity = 'ok' if mismatch is None else f'frame {mismatch}'
+        print(f'{name:<14} {parity:>8} {scalar / FRAMES * 1000:>15.3f} {batched / FRAMES * 1000:>16.3f}')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
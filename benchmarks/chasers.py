@@ -0,0 +1,83 @@
+"""Cost of enemies that chase the player along the level's navigation graph.
+
+    python -m benchmarks.chasers
+    python -m benchmarks.chasers --counts 10 100 1000 --steps 600
+
+Builds generated levels filled with 'chaser' enemies, runs the player right
+for a while and reports the world step cost per step and per live chaser
+(long levels stream, so only chasers near the camera are live), how many
+chasers reached the player's platform, and the route cache hit rate.
+Also times building the navigation graph against reading it from the cache.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from benchmarks.levelgen import generate_level
+from src.level_compiler import LevelCache
+from src.level_manager import build_level
+from src.simulation import World, InputState, init_headless
+
+PLATFORMS = 200
+
+def run(count, steps, seed):
+    """Step a level with count chasers; returns (ms per step, live chasers, chasers that reached the player, nav stats)"""
+    world = World(build_level(generate_level(PLATFORMS, count, 0, seed=seed, enemy_type='chaser')))
+    player = world.player
+    # Chasers catching up must not end the run
+    player.invincible = True
+    player.invincible_timer = steps + 1
+    caught = set()
+    timings = []
+    live = []
+    for step in range(steps):
+        inputs = InputState(right=(step // 120) % 2 == 0, jump=step % 45 == 0)
+        start = time.perf_counter()
+        world.step(inputs)
+        timings.append(time.perf_counter() - start)
+        live.append(len(world.enemies))
+        goal = world.nav.span_under(player.rect.centerx, player.rect.bottom)
+        caught.update(enemy for enemy in world.enemies if enemy.span is not None and enemy.span == goal)
+    return statistics.fmean(timings) * 1000, statistics.fmean(live), len(caught), world.nav.stats()
+
+def time_cache(seed):
+    """(build ms, cached load ms) of one generated level's navigation graph"""
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'level1.json'), 'w') as f:
+            json.dump(generate_level(PLATFORMS * 5, 1, 0, seed=seed, enemy_type='chaser'), f)
+        LevelCache(directory).load('level1.json')
+        start = time.perf_counter()
+        LevelCache(directory).load('level1.json').navigation()
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        LevelCache(directory).load('level1.json').navigation()
+        cached = time.perf_counter() - start
+    return built * 1000, cached * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Time chasing enemies and the navigation graph cache')
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--steps', type=int, default=600)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    init_headless()
+    built, cached = time_cache(args.seed)
+    print(f'navigation graph, {PLATFORMS * 5} platforms: build {built:.1f} ms, cached load {cached:.1f} ms')
+    print(f"{'chasers':>7} {'live':>6} {'ms/step':>8} {'us/live':>8} {'reached':>7} {'routes':>6} {'hit rate':>8}")
+    for count in args.counts:
+        ms, live, reached, stats = run(count, args.steps, args.seed)
+        queries = stats['route_hits'] + stats['route_misses']
+        print(f"{count:>7} {live:>6.0f} {ms:>8.3f} {ms * 1000 / max(live, 1):>8.2f} {reached:>7} {stats['route_misses']:>6} "
+              f"{stats['route_hits'] / max(queries, 1):>8.1%}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
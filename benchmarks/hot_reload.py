@@ -0,0 +1,131 @@
+"""Cost of leaving level hot reload on while play-testing large levels.
+
+    python -m benchmarks.hot_reload
+    python -m benchmarks.hot_reload --sizes 100 1000 10000 --edits 5
+
+Writes generated levels to a temporary directory, both as long streamed
+levels and packed into few enough chunks to be assembled whole, plays each
+for a while and then saves small edits to it: one platform moved, one enemy
+moved, one coin deleted and one added. Reports the idle poll cost per frame
+(a directory scan at each interval, nothing in between), the cost of
+recompiling the edited file, which any reload pays, then applying the diff
+to the running world against the full rebuild a plain reload would do,
+which also resets the player.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from benchmarks.levelgen import generate_level
+from src.hot_reload import LevelReloader, LevelWatcher
+from src.level_compiler import LevelCache
+from src.level_manager import build_compiled_level
+from src.settings import HOT_RELOAD_INTERVAL, LEVEL_CHUNK_WIDTH, STREAM_MIN_CHUNKS
+from src.simulation import World, InputState, init_headless
+
+FILENAME = 'level1.json'
+
+def save(directory, level, stamp):
+    path = os.path.join(directory, FILENAME)
+    with open(path, 'w') as f:
+        json.dump(level, f)
+    # Editors save far apart in time; make every save visible to the mtime check
+    os.utime(path, ns=(stamp, stamp))
+
+def edit(level, step):
+    """One small edit of each kind around the middle of the level, different every step"""
+    # The first platform is the ground along the whole level; a typical edit touches one column
+    platform = level['platforms'][len(level['platforms']) // 2 + step]
+    platform['y'] -= 10
+    if level['enemy_spawns']:
+        level['enemy_spawns'][len(level['enemy_spawns']) // 2 + step]['x'] += 20
+    coin = level['coins'].pop(len(level['coins']) // 2 + step)
+    level['coins'].append({'x': coin['x'] + 30, 'y': coin['y'] - 30})
+
+def idle_poll_us(reloader, frames):
+    """Mean cost per frame of polling an unchanged file at the default interval and of scanning every frame"""
+    timings = {}
+    for interval in (HOT_RELOAD_INTERVAL, 0):
+        reloader.watcher.interval = interval
+        reloader.watcher.next_check = 0.0
+        samples = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            reloader.poll()
+            samples.append(time.perf_counter() - start)
+        timings[interval] = statistics.fmean(samples) * 1e6
+    return timings[HOT_RELOAD_INTERVAL], timings[0]
+
+def run(size, streamed, edits, seed):
+    with tempfile.TemporaryDirectory() as directory:
+        width = None if streamed else LEVEL_CHUNK_WIDTH * STREAM_MIN_CHUNKS
+        level = generate_level(size, size // 5, size, seed=seed, width=width)
+        save(directory, level, 10 ** 18)
+        cache = LevelCache(directory)
+        data = build_compiled_level(cache.load(FILENAME))
+        world = World(data)
+        reloader = LevelReloader(world, FILENAME, data['compiled'], cache, LevelWatcher(directory, 0))
+        reloader.poll()
+        for step in range(300):
+            world.step(InputState(right=True, jump=step % 40 == 0))
+        steady, scanning = idle_poll_us(reloader, 600)
+
+        reloader.watcher.interval = 0
+        reloader.watcher.next_check = 0.0
+        compiled_ms = []
+        applied = []
+        rebuilt = []
+        player = tuple(world.player.rect)
+        for step in range(edits):
+            edit(level, step)
+            save(directory, level, 10 ** 18 + step + 1)
+            # What poll() does, timed in two parts
+            start = time.perf_counter()
+            assert FILENAME in reloader.watcher.poll()
+            compiled = cache.load(FILENAME)
+            compiled_ms.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            summary = reloader.apply(compiled)
+            applied.append(time.perf_counter() - start)
+            assert summary is not None and tuple(world.player.rect) == player, summary
+            start = time.perf_counter()
+            World(build_compiled_level(cache.load(FILENAME)))
+            rebuilt.append(time.perf_counter() - start)
+        return {
+            'streamed': world.streamer is not None,
+            'steady_us': steady,
+            'scan_us': scanning,
+            'compile_ms': statistics.median(compiled_ms) * 1000,
+            'apply_ms': statistics.median(applied) * 1000,
+            'rebuild_ms': statistics.median(rebuilt) * 1000,
+            'live': len(world.platforms) + len(world.enemies) + len(world.coins)
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Time level hot reload polling and incremental edits')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help='platforms per level')
+    parser.add_argument('--streamed-only', action='store_true', help='skip the levels packed into few chunks')
+    parser.add_argument('--edits', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    init_headless()
+    print(f"{'platforms':>9} {'streamed':>8} {'live':>6} {'poll us':>8} {'scan us':>8} "
+          f"{'compile ms':>10} {'apply ms':>8} {'rebuild ms':>10}")
+    for streamed in (True,) if args.streamed_only else (False, True):
+        for size in args.sizes:
+            result = run(size, streamed, args.edits, args.seed)
+            print(f"{size:>9} {'yes' if result['streamed'] else 'no':>8} {result['live']:>6} {result['steady_us']:>8.2f} "
+                  f"{result['scan_us']:>8.2f} {result['compile_ms']:>10.2f} {result['apply_ms']:>8.2f} "
+                  f"{result['rebuild_ms']:>10.2f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""CPU the game burns while it sits on the main menu, with and without idle throttling.
+
+    python -m benchmarks.idle_cpu
+    python -m benchmarks.idle_cpu --seconds 20
+
+Starts main.py headlessly twice, once as shipped and once with --busy-menus
+(the old redraw-every-frame loop), leaves each on the menu, asks it to quit
+and compares the idle CPU share the game prints on exit.
+"""
+import argparse
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IDLE_LINE = re.compile(r'Idle screens: ([\d.]+)% CPU over ([\d.]+)s')
+
+def measure(seconds, extra_args=()):
+    """Run the game on its menu for seconds; returns (CPU percent, seconds measured)"""
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    game = subprocess.Popen([sys.executable, 'main.py', *extra_args], cwd=ROOT, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    time.sleep(seconds)
+    # SDL turns SIGTERM into a QUIT event, so the game shuts down normally
+    game.send_signal(signal.SIGTERM)
+    output, _ = game.communicate(timeout=30)
+    match = IDLE_LINE.search(output)
+    if match is None:
+        raise RuntimeError(f'main.py printed no idle CPU line:\n{output}')
+    return float(match.group(1)), float(match.group(2))
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare menu CPU use with and without idle throttling')
+    parser.add_argument('--seconds', type=float, default=10.0, help='time to leave each run on the menu')
+    args = parser.parse_args()
+
+    print(f"{'loop':<12} {'CPU':>6} {'over s':>7}")
+    for name, extra in (('busy', ['--busy-menus']), ('throttled', [])):
+        cpu, wall = measure(args.seconds, extra)
+        print(f'{name:<12} {cpu:>5.1f}% {wall:>7.1f}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
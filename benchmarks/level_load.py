@@ -0,0 +1,72 @@
+"""Compare JSON and compiled level load times on generated levels.
+
+    python -m benchmarks.level_load
+
+Levels are packed into STREAM_MIN_CHUNKS chunks, the widest layout that is
+still built in full, so 'json build' and 'bin build' do the same work.
+'bin stream' is the same objects spread over a level long enough to stream,
+where a load only activates the chunks around the start; it is reported on
+its own since it builds a fraction of the level.
+"""
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from benchmarks.levelgen import generate_level
+from src.level_compiler import LevelCache
+from src.level_manager import build_level, build_compiled_level
+from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT, LEVEL_CHUNK_WIDTH, STREAM_MIN_CHUNKS
+
+SIZES = [100, 1000, 10000, 50000]
+REPEATS = 5
+PACKED_WIDTH = STREAM_MIN_CHUNKS * LEVEL_CHUNK_WIDTH
+
+def best_of(func):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    print(f"{'objects':>8} {'json parse':>11} {'bin open':>9} {'json build':>11} {'bin build':>10} {'bin stream':>11}"
+          f"   (ms, best of {REPEATS})")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = LevelCache(directory)
+        for size in SIZES:
+            counts = {'platforms': size // 2, 'enemies': size // 4, 'coins': size // 4, 'seed': size}
+            filename = f'level{size}.json'
+            path = os.path.join(directory, filename)
+            with open(path, 'w') as f:
+                json.dump(generate_level(width=PACKED_WIDTH, **counts), f)
+            streamed = f'streamed{size}.json'
+            with open(os.path.join(directory, streamed), 'w') as f:
+                json.dump(generate_level(**counts), f)
+            # Compile once so the timings below hit the cache
+            cache.load(filename)
+            cache.load(streamed)
+
+            def parse_json():
+                with open(path) as f:
+                    return json.load(f)
+
+            json_parse = best_of(parse_json)
+            bin_open = best_of(lambda: cache.load(filename))
+            if size <= 10000:
+                json_build = best_of(lambda: build_level(parse_json()))
+                bin_build = best_of(lambda: build_compiled_level(cache.load(filename)))
+                bin_stream = best_of(lambda: build_compiled_level(cache.load(streamed)))
+                print(f'{size:>8} {json_parse:>11.2f} {bin_open:>9.2f} {json_build:>11.1f} {bin_build:>10.1f} {bin_stream:>11.1f}')
+            else:
+                print(f"{size:>8} {json_parse:>11.2f} {bin_open:>9.2f} {'-':>11} {'-':>10} {'-':>11}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Generate synthetic stress levels in the same JSON format as levels/levelN.json.
+
+    python -m benchmarks.levelgen --platforms 2000 --enemies 1000 --coins 2000 -o /tmp/stress.json
+"""
+import argparse
+import json
+import random
+
+GROUND_Y = 680
+MIN_WIDTH = 3840
+
+def generate_level(platforms=100, enemies=50, coins=100, seed=0, width=None, enemy_type='basic'):
+    """Return level data with the requested entity counts spread along the level"""
+    rng = random.Random(seed)
+    width = width or max(MIN_WIDTH, platforms * 150)
+    level = {
+        'name': f'Generated {platforms}p/{enemies}e/{coins}c seed {seed}',
+        'width': width,
+        'platforms': [{'x': 0, 'y': GROUND_Y, 'width': width, 'height': 40}],
+        'enemy_spawns': [],
+        'coins': [],
+        'end_position': {'x': width - 200, 'y': GROUND_Y - 100}
+    }
+    for _ in range(max(0, platforms - 1)):
+        level['platforms'].append({
+            'x': rng.randrange(200, width - 300),
+            'y': rng.randrange(200, GROUND_Y - 80, 20),
+            'width': rng.randrange(100, 320, 20),
+            'height': 20
+        })
+    for _ in range(enemies):
+        level['enemy_spawns'].append({'x': rng.randrange(300, width - 300), 'y': rng.randrange(100, 600), 'type': enemy_type})
+    for _ in range(coins):
+        level['coins'].append({'x': rng.randrange(100, width - 100), 'y': rng.randrange(150, GROUND_Y - 40)})
+    return level
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic stress level as JSON')
+    parser.add_argument('--platforms', type=int, default=100)
+    parser.add_argument('--enemies', type=int, default=50)
+    parser.add_argument('--coins', type=int, default=100)
+    parser.add_argument('--width', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--enemy-type', default='basic', help="'basic' patrols, 'chaser' follows the player")
+    parser.add_argument('-o', '--output', default='-')
+    args = parser.parse_args()
+
+    level = generate_level(args.platforms, args.enemies, args.coins, args.seed, args.width, args.enemy_type)
+    if args.output == '-':
+        print(json.dumps(level))
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(level, f)
+
+if __name__ == '__main__':
+    main()
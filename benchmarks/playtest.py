@@ -0,0 +1,182 @@
+"""Play levels headlessly across all cores to find unwinnable or slow ones.
+
+    python -m benchmarks.playtest                         # every levels/ file, all policies, 4 seeds
+    python -m benchmarks.playtest --generated 1000 -j 8 -o playtest.json
+    python -m benchmarks.playtest --generated 200 --scaling
+
+Each task plays one level with one input policy and seed until the flag is
+reached or the step budget runs out, restarting from the last checkpoint on
+game over. Tasks run in a process pool and the results are aggregated per
+level and policy.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from benchmarks.levelgen import generate_level
+from src.level_manager import load_level, build_level, get_max_level
+from src.simulation import World, InputState, init_headless
+
+MAX_STEPS = 60 * 180  # three minutes of game time per attempt
+SLOW_STEP_MS = 2.0  # p99 step cost above which a level is reported as slow
+
+# Policies map (rng, step, memory dict) to the input for that step
+def run_right(rng, step, memory):
+    return InputState(right=True, jump=step % 40 == 0)
+
+def run_and_shoot(rng, step, memory):
+    return InputState(right=True, jump=step % 40 == 0, shoot=step % 15 == 0)
+
+def random_policy(rng, step, memory):
+    # Hold a direction for a while like a player would, mostly heading right
+    if step % 20 == 0:
+        memory['direction'] = rng.choices(('right', 'left', 'none'), (0.75, 0.15, 0.1))[0]
+    direction = memory['direction']
+    return InputState(direction == 'left', direction == 'right', rng.random() < 0.08, rng.random() < 0.05)
+
+POLICIES = {
+    'right': run_right,
+    'shoot': run_and_shoot,
+    'random': random_policy
+}
+
+GENERATED_SIZE = {'platforms': 60, 'enemies': 25, 'coins': 60}
+
+def make_level(source):
+    kind, value = source
+    if kind == 'file':
+        return load_level(value)
+    return build_level(generate_level(seed=value, **GENERATED_SIZE))
+
+def play(task):
+    """Run one (level source, policy, seed) task and return its result row"""
+    source, policy_name, seed = task
+    random.seed(seed)
+    rng = random.Random(seed)
+    policy = POLICIES[policy_name]
+    memory = {}
+    world = World(make_level(source))
+    coins_total = len(world.coins)
+    deaths = hurts = 0
+    completed = False
+    timings = []
+    clock = time.perf_counter
+    for step in range(MAX_STEPS):
+        inputs = policy(rng, step, memory)
+        start = clock()
+        events = world.step(inputs)
+        timings.append(clock() - start)
+        hurts += events.count('hurt')
+        if 'level_complete' in events:
+            completed = True
+            break
+        if 'game_over' in events:
+            deaths += 1
+            world.restart()
+    timings.sort()
+    return {
+        'level': f'{source[0]}:{source[1]}',
+        'policy': policy_name,
+        'seed': seed,
+        'completed': completed,
+        'steps': len(timings),
+        'coins': world.player.coins,
+        'coins_total': coins_total,
+        'deaths': deaths,
+        'hurts': hurts,
+        'step_ms_mean': statistics.fmean(timings) * 1000,
+        'step_ms_p99': timings[len(timings) * 99 // 100] * 1000,
+        'step_ms_max': timings[-1] * 1000
+    }
+
+def build_tasks(args):
+    sources = [('file', n) for n in range(1, get_max_level() + 1)] if not args.no_files else []
+    sources += [('generated', args.generated_seed + i) for i in range(args.generated)]
+    return [(source, policy, seed) for source in sources for policy in args.policy for seed in range(args.seeds)]
+
+def run_pool(tasks, jobs):
+    """Play every task on jobs processes; returns (results, wall seconds)"""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_headless) as pool:
+        results = list(pool.map(play, tasks, chunksize=max(1, len(tasks) // (jobs * 8))))
+    return results, time.perf_counter() - start
+
+def aggregate(results):
+    """Per (level, policy) completion rate, coins, deaths and step cost"""
+    groups = {}
+    for row in results:
+        groups.setdefault((row['level'], row['policy']), []).append(row)
+    summary = []
+    for (level, policy), rows in sorted(groups.items()):
+        summary.append({
+            'level': level,
+            'policy': policy,
+            'runs': len(rows),
+            'completion': sum(row['completed'] for row in rows) / len(rows),
+            'coins': statistics.fmean(row['coins'] for row in rows),
+            'coins_total': rows[0]['coins_total'],
+            'deaths': statistics.fmean(row['deaths'] for row in rows),
+            'steps': statistics.fmean(row['steps'] for row in rows),
+            'step_ms_mean': statistics.fmean(row['step_ms_mean'] for row in rows),
+            'step_ms_p99': max(row['step_ms_p99'] for row in rows)
+        })
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description='Play levels headlessly in parallel and report completion and cost')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count())
+    parser.add_argument('--policy', action='append', choices=sorted(POLICIES))
+    parser.add_argument('--seeds', type=int, default=4, help='seeds per level and policy')
+    parser.add_argument('--generated', type=int, default=0, help='generated level variants to add')
+    parser.add_argument('--generated-seed', type=int, default=1000)
+    parser.add_argument('--no-files', action='store_true', help='skip the levels/ directory')
+    parser.add_argument('--scaling', action='store_true', help='time the same tasks on 1, 2, 4 ... jobs')
+    parser.add_argument('-o', '--output')
+    args = parser.parse_args()
+    args.policy = args.policy or sorted(POLICIES)
+
+    tasks = build_tasks(args)
+    if args.scaling:
+        jobs = 1
+        base = None
+        print(f"{'jobs':>4} {'wall s':>8} {'tasks/s':>8} {'speedup':>8}")
+        while jobs <= args.jobs:
+            _, wall = run_pool(tasks, jobs)
+            base = base or wall
+            print(f'{jobs:>4} {wall:>8.2f} {len(tasks) / wall:>8.1f} {base / wall:>7.2f}x')
+            jobs *= 2
+        return 0
+
+    results, wall = run_pool(tasks, args.jobs)
+    summary = aggregate(results)
+    steps = sum(row['steps'] for row in results)
+    print(f"{'level':<16} {'policy':<7} {'runs':>4} {'done':>5} {'coins':>11} {'deaths':>6} {'steps':>7} {'ms/step':>7} {'p99 ms':>7}")
+    for row in summary:
+        flags = []
+        if row['completion'] == 0:
+            flags.append('NEVER COMPLETED')
+        if row['step_ms_p99'] > SLOW_STEP_MS:
+            flags.append('SLOW')
+        line = (f"{row['level']:<16} {row['policy']:<7} {row['runs']:>4} {row['completion']:>5.0%} "
+                f"{row['coins']:>5.1f}/{row['coins_total']:<5} {row['deaths']:>6.1f} {row['steps']:>7.0f} "
+                f"{row['step_ms_mean']:>7.3f} {row['step_ms_p99']:>7.3f}  {' '.join(flags)}")
+        print(line.rstrip())
+    print(f'{len(tasks)} tasks, {steps} steps in {wall:.1f}s on {args.jobs} processes '
+          f'({len(tasks) / wall:.1f} tasks/s, {steps / wall:.0f} steps/s)')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'jobs': args.jobs, 'wall_s': wall, 'summary': summary, 'runs': results}, f, indent=2)
+        print(f'Wrote {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Cost of drawing gameplay frames at lower internal render resolutions.
+
+    python -m benchmarks.render_scale
+    python -m benchmarks.render_scale --scales 1 0.5 --frames 600 --budget-ms 2
+    python -m benchmarks.render_scale --crowd 10
+
+Runs a generated level headlessly and times draw_world at each scale,
+including the upscale onto the 1280x720 window, then runs the same frames
+in auto mode against a work budget and reports which scale it settled on.
+The dummy video driver draws in software, much like the fill-rate bound
+machines the low resolutions are for. The upscale costs about one opaque
+full-window blit, so a lower scale only pays off once a frame draws more
+than that: --crowd multiplies the enemies and coins to add overdraw.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from benchmarks.levelgen import generate_level
+from src.assets import assets
+from src.camera import Camera, Renderer
+from src.game import draw_world, prepare_scale
+from src.level_manager import build_level
+from src.render_target import RenderTarget
+from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT, RENDER_SCALES
+from src.simulation import World, InputState
+from src.sprites import SPRITE_VARIANTS
+
+def frames(level, count):
+    """World after each of count steps running right, jumping now and then"""
+    world = World(build_level(level))
+    world.player.invincible = True
+    world.player.invincible_timer = count + 1
+    for step in range(count):
+        world.step(InputState(right=True, jump=step % 40 == 0))
+        yield world
+
+def run(screen, level, count, scale, auto=False, budget=None):
+    """Draw count frames; returns (draw ms per frame, {scale: frames drawn at it}, final target)"""
+    target = RenderTarget(screen, scale, auto, budget=budget) if auto else RenderTarget(screen, scale)
+    renderer = Renderer(target.surface, Camera(), target.scale)
+    timings = []
+    at_scale = {}
+    for world in frames(level, count):
+        start = time.perf_counter()
+        draw_world(target, renderer, world, 1.0, 1)
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        at_scale[target.scale] = at_scale.get(target.scale, 0) + 1
+        if target.adapt(elapsed):
+            renderer.set_target(target.surface, target.scale)
+    return statistics.median(timings) * 1000, at_scale, target
+
+def main():
+    parser = argparse.ArgumentParser(description='Time gameplay drawing at lower internal render resolutions')
+    parser.add_argument('--scales', type=float, nargs='+', default=list(RENDER_SCALES))
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--budget-ms', type=float, help='auto mode frame budget; defaults to halfway between '
+                                                        'the full and lowest scale draw times')
+    parser.add_argument('--crowd', type=int, default=1, help='multiply the enemies and coins by this')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    assets.preload(variants=SPRITE_VARIANTS)
+    for scale in set(args.scales) | set(RENDER_SCALES):
+        prepare_scale(scale)
+    level = generate_level(100, 40 * args.crowd, 150 * args.crowd, seed=args.seed)
+
+    print(f"{'scale':>5} {'resolution':>10} {'draw ms':>8} {'vs full':>8}")
+    results = {}
+    for scale in args.scales:
+        ms, _, target = run(screen, level, args.frames, scale)
+        results[scale] = ms
+        width, height = target.surface.get_size()
+        print(f'{scale:>5g} {f"{width}x{height}":>10} {ms:>8.3f} {ms / results[args.scales[0]]:>7.0%}')
+
+    budget = args.budget_ms
+    if budget is None:
+        budget = (max(results.values()) + min(results.values())) / 2
+    _, at_scale, target = run(screen, level, args.frames, max(RENDER_SCALES), True, budget / 1000)
+    spent = ', '.join(f'{scale:g}: {count}' for scale, count in sorted(at_scale.items(), reverse=True))
+    rejected = ', '.join(f'{scale:g}' for scale in sorted(target.rejected)) or 'none'
+    print(f'auto mode, {budget:.3f} ms budget: settled on {target.scale:g} after {target.changes} changes '
+          f'(frames per scale {spent}; dropped for no gain: {rejected})')
+    pygame.quit()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
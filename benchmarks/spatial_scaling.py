@@ -0,0 +1,74 @@
+"""Compare linear collision scans with the spatial hash from 10 to 10,000 entities.
+
+Both sides find every platform each entity overlaps. 'grid ms' always uses
+the grid; 'index ms' is SpatialGroup as the game builds it, which scans
+linearly below SPATIAL_MIN_ITEMS members.
+
+Run from the repository root:
+    python -m benchmarks.spatial_scaling
+"""
+import os
+import random
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from src.settings import SPATIAL_MIN_ITEMS
+from src.spatial import SpatialGroup
+
+COUNTS = [10, 100, 200, 1000, 10000]
+FRAMES = 20
+
+class Box(pygame.sprite.Sprite):
+    def __init__(self, x, y, width, height):
+        super().__init__()
+        self.rect = pygame.Rect(x, y, width, height)
+
+def build(count, rng):
+    """Entities and platforms spread over a level that grows with the entity count"""
+    level_width = max(3840, count * 40)
+    platforms = [Box(rng.randrange(level_width), rng.randrange(100, 680), 200, 20) for _ in range(count // 2 + 5)]
+    entities = [Box(rng.randrange(level_width), rng.randrange(0, 640), 80, 80) for _ in range(count)]
+    return platforms, entities
+
+def step(entities, rng):
+    for entity in entities:
+        entity.rect.x += rng.choice((-2, 2))
+
+def run_linear(platforms, entities, rng):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        step(entities, rng)
+        for entity in entities:
+            # Every hit, in order, as SpatialGroup.colliding returns them
+            [platform for platform in platforms if entity.rect.colliderect(platform.rect)]
+    return (time.perf_counter() - start) / FRAMES
+
+def run_spatial(platforms, entities, rng, min_items=SPATIAL_MIN_ITEMS):
+    static = SpatialGroup(platforms, min_items=min_items)
+    moving = SpatialGroup(entities, min_items=min_items)
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        step(entities, rng)
+        moving.reindex()
+        for entity in entities:
+            static.colliding(entity.rect)
+    return (time.perf_counter() - start) / FRAMES
+
+def main():
+    print(f"{'entities':>10} {'linear ms':>12} {'grid ms':>12} {'index ms':>12} {'speedup':>9}")
+    for count in COUNTS:
+        platforms, entities = build(count, random.Random(count))
+        grid = run_spatial(platforms, entities, random.Random(0), min_items=0)
+        index = run_spatial(platforms, entities, random.Random(0))
+        if count <= 1000:
+            linear = run_linear(platforms, entities, random.Random(0))
+            print(f'{count:>10} {linear * 1000:>12.3f} {grid * 1000:>12.3f} {index * 1000:>12.3f} {linear / index:>8.1f}x')
+        else:
+            # The linear scan takes minutes at this size
+            print(f"{count:>10} {'-':>12} {grid * 1000:>12.3f} {index * 1000:>12.3f} {'-':>9}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Check that lower simulation rates play out exactly like the 60 Hz reference.
+
+    python -m benchmarks.step_rate
+    python -m benchmarks.step_rate --rates 30 20 --policy shoot --seeds 2
+
+Every run records the 60 Hz input sequence of a playtest policy and aligns it
+to the longest step being compared: keys are held for whole steps and presses
+moved to the first base step of the step that covers them, since a long step
+can only take input at its start. The aligned sequence is played at 60 Hz and
+folded into each lower rate. A run ends at level complete or game over; it
+reports when it ended, coins, lives, and how far the player drifts from the
+60 Hz path at the same game time. The tunnel checks drop the player onto a
+thin platform from high up and fire a fast projectile at an enemy; without
+swept collisions both pass straight through at long steps.
+
+Exits non-zero if a tunnel check fails or any run ends with a different
+outcome, coins or lives than at 60 Hz.
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from benchmarks.levelgen import generate_level
+from benchmarks.playtest import POLICIES
+from src.level_manager import load_level, build_level, get_max_level
+from src.settings import PHYSICS_RATE
+from src.simulation import World, InputState, init_headless
+from src.sprites import Enemy
+
+MAX_SECONDS = 120
+
+def record_inputs(policy, seed, steps):
+    rng = random.Random(seed)
+    memory = {}
+    return [policy(rng, step, memory) for step in range(steps)]
+
+def align(inputs, dt):
+    """inputs with keys held for whole groups of dt base steps and each group's presses on its first"""
+    aligned = []
+    for start in range(0, len(inputs) - dt + 1, dt):
+        group = inputs[start:start + dt]
+        held = InputState(group[0].left, group[0].right)
+        aligned.append(held._replace(jump=any(i.jump for i in group), shoot=any(i.shoot for i in group)))
+        aligned.extend([held] * (dt - 1))
+    return aligned
+
+def fold(inputs, dt):
+    """Inputs for a rate dt times slower: held keys from the first base step, presses from any"""
+    folded = []
+    for start in range(0, len(inputs) - dt + 1, dt):
+        group = inputs[start:start + dt]
+        folded.append(InputState(group[0].left, group[0].right,
+                                 any(i.jump for i in group), any(i.shoot for i in group)))
+    return folded
+
+def play(level_data, rate, inputs, seed):
+    """Run inputs at rate; returns (result row, player position after each step)"""
+    random.seed(seed)
+    world = World(level_data, rate=rate)
+    outcome = None
+    ended_at = None
+    path = []
+    start = time.perf_counter()
+    for step, step_inputs in enumerate(inputs):
+        events = world.step(step_inputs)
+        path.append(world.player.rect.topleft)
+        if 'level_complete' in events or 'game_over' in events:
+            outcome = 'complete' if 'level_complete' in events else 'game over'
+            ended_at = (step + 1) / rate
+            break
+    elapsed = time.perf_counter() - start
+    return {'outcome': outcome, 'ended_at': ended_at, 'coins': world.player.coins, 'lives': world.player.lives,
+            'ms_per_second': elapsed * 1000 / max(len(path) / rate, 1e-9)}, path
+
+def drift(reference, path, dt):
+    """Mean and max distance between a path and the 60 Hz one at the same game times"""
+    distances = []
+    for step, (x, y) in enumerate(path):
+        base = (step + 1) * dt - 1
+        if base >= len(reference):
+            break
+        rx, ry = reference[base]
+        distances.append(((x - rx) ** 2 + (y - ry) ** 2) ** 0.5)
+    if not distances:
+        return 0.0, 0.0
+    return statistics.fmean(distances), max(distances)
+
+def tunnel_checks(rate):
+    """(player landed on a thin platform after a long fall, fast projectile hit its enemy) at rate"""
+    level = {'platforms': [{'x': 0, 'y': 680, 'width': 600, 'height': 20}], 'enemy_spawns': [], 'coins': []}
+    world = World(build_level(level), rate=rate)
+    world.player.rect.topleft = (200, -4000)
+    for _ in range(rate * 3):
+        world.step()
+    landed = world.player.rect.bottom == 680
+
+    world = World(build_level({'platforms': [], 'enemy_spawns': [], 'coins': []}), rate=rate)
+    enemy = Enemy(700, 300)
+    enemy.speed = 0
+    world.enemies.add(enemy)
+    projectile = world.projectile_pool.acquire(300, 340, 1)
+    projectile.speed = 150  # Faster than the enemy is wide, even at 60 Hz
+    world.projectiles.add(projectile)
+    for _ in range(rate):
+        world.step()
+    return landed, not enemy.alive()
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare lower simulation rates against the 60 Hz reference')
+    parser.add_argument('--rates', type=int, nargs='+', default=[30])
+    parser.add_argument('--policy', action='append', choices=sorted(POLICIES))
+    parser.add_argument('--seeds', type=int, default=1)
+    parser.add_argument('--generated', type=int, default=2, help='generated levels to add to the levels/ files')
+    args = parser.parse_args()
+    policies = args.policy or sorted(POLICIES)
+    if any(PHYSICS_RATE % rate for rate in args.rates):
+        parser.error(f'rates must divide {PHYSICS_RATE}')
+
+    init_headless()
+    sources = [(f'file:{n}', lambda n=n: load_level(n)) for n in range(1, get_max_level() + 1)]
+    sources += [(f'generated:{seed}', lambda seed=seed: build_level(generate_level(60, 25, 60, seed=seed)))
+                for seed in range(1000, 1000 + args.generated)]
+
+    print(f"{'level':<14} {'policy':<7} {'rate':>4} {'outcome':<9} {'at s':>6} {'coins':>5} {'lives':>5} "
+          f"{'drift px':>8} {'max px':>7} {'ms/game s':>9}")
+    # Inputs aligned to the longest step line up with every shorter one too
+    group = math.lcm(*(PHYSICS_RATE // rate for rate in args.rates))
+    changed = 0
+    for name, build in sources:
+        for policy in policies:
+            for seed in range(args.seeds):
+                inputs = align(record_inputs(POLICIES[policy], seed, PHYSICS_RATE * MAX_SECONDS), group)
+                reference, reference_path = play(build(), PHYSICS_RATE, inputs, seed)
+                rows = [(PHYSICS_RATE, reference, 0.0, 0.0)]
+                for rate in args.rates:
+                    dt = PHYSICS_RATE // rate
+                    result, path = play(build(), rate, fold(inputs, dt), seed)
+                    rows.append((rate, result) + drift(reference_path, path, dt))
+                    changed += any(result[key] != reference[key] for key in ('outcome', 'coins', 'lives'))
+                for rate, result, mean, worst in rows:
+                    ended = f"{result['ended_at']:.2f}" if result['ended_at'] is not None else '-'
+                    print(f"{name:<14} {policy:<7} {rate:>4} {result['outcome'] or '-':<9} {ended:>6} {result['coins']:>5} "
+                          f"{result['lives']:>5} {mean:>8.1f} {worst:>7.1f} {result['ms_per_second']:>9.2f}")
+
+    print()
+    print(f"{'rate':>4} {'long fall lands':>15} {'fast shot hits':>14}")
+    failed = 0
+    for rate in [PHYSICS_RATE] + args.rates:
+        landed, hit = tunnel_checks(rate)
+        failed += (not landed) + (not hit)
+        print(f"{rate:>4} {'ok' if landed else 'FAIL':>15} {'ok' if hit else 'FAIL':>14}")
+    print(f'{changed} runs ended with a different outcome, coins or lives than at 60 Hz')
+    return 1 if changed or failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""Headless performance suite over generated stress levels.
+
+    python -m benchmarks.suite run -o bench.json
+    python -m benchmarks.suite compare old.json new.json
+
+Each scenario times level loading once, then the update and draw phases of
+every frame, and reports p50/p95/p99 in milliseconds.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from benchmarks.levelgen import generate_level
+from src.assets import assets
+from src.camera import Camera, Renderer
+from src.game import draw_world
+from src.level_manager import build_level
+from src.render_target import RenderTarget
+from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from src.simulation import World, InputState
+from src.sprites import SPRITE_VARIANTS
+
+SCENARIOS = {
+    'small': {'platforms': 20, 'enemies': 10, 'coins': 20, 'projectiles': 5},
+    'medium': {'platforms': 200, 'enemies': 100, 'coins': 200, 'projectiles': 20},
+    'large': {'platforms': 2000, 'enemies': 1000, 'coins': 2000, 'projectiles': 50},
+    'huge': {'platforms': 10000, 'enemies': 5000, 'coins': 10000, 'projectiles': 100}
+}
+PHASES = ('update', 'draw')
+
+def percentiles(samples):
+    """p50/p95/p99 and mean of samples given in seconds, reported in milliseconds"""
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {
+        'p50': cuts[49] * 1000,
+        'p95': cuts[94] * 1000,
+        'p99': cuts[98] * 1000,
+        'mean': statistics.fmean(samples) * 1000
+    }
+
+def top_up_projectiles(world, count):
+    """Keep count projectiles in flight around the player"""
+    player = world.player
+    direction = 1
+    while len(world.projectiles) < count:
+        projectile = world.projectile_pool.acquire(player.rect.centerx + 20 * direction, player.rect.centery, direction)
+        if projectile is None:
+            break
+        world.projectiles.add(projectile)
+        direction = -direction
+
+def run_scenario(spec, frames, seed=0):
+    screen = pygame.display.get_surface()
+    level_json = json.dumps(generate_level(spec['platforms'], spec['enemies'], spec['coins'], seed))
+
+    start = time.perf_counter()
+    world = World(build_level(json.loads(level_json)))
+    load_time = time.perf_counter() - start
+
+    target = RenderTarget(screen, 1)
+    renderer = Renderer(screen, Camera())
+    samples = {phase: [] for phase in PHASES}
+    for frame in range(frames):
+        top_up_projectiles(world, spec['projectiles'])
+        inputs = InputState(right=True, jump=frame % 45 == 0)
+
+        start = time.perf_counter()
+        world.step(inputs)
+        middle = time.perf_counter()
+        draw_world(target, renderer, world, 1.0, 1)
+        end = time.perf_counter()
+
+        samples['update'].append(middle - start)
+        samples['draw'].append(end - middle)
+
+    result = {'load_ms': load_time * 1000, 'frames': frames}
+    for phase in PHASES:
+        result[phase] = percentiles(samples[phase])
+    return result
+
+def run(args):
+    pygame.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    assets.preload(variants=SPRITE_VARIANTS)
+
+    names = args.scenario or list(SCENARIOS)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'machine': platform.machine(),
+            'frames': args.frames
+        },
+        'scenarios': {}
+    }
+    print(f"{'scenario':<8} {'load ms':>9} " + ' '.join(f'{phase + " " + p:>12}' for phase in PHASES for p in ('p50', 'p95', 'p99')))
+    for name in names:
+        result = run_scenario(SCENARIOS[name], args.frames)
+        report['scenarios'][name] = result
+        print(f"{name:<8} {result['load_ms']:>9.1f} " + ' '.join(
+            f'{result[phase][p]:>12.3f}' for phase in PHASES for p in ('p50', 'p95', 'p99')))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Wrote {args.output}')
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)['scenarios']
+    with open(args.current) as f:
+        current = json.load(f)['scenarios']
+
+    regressions = []
+    print(f"{'scenario':<8} {'metric':<12} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(set(baseline) & set(current)):
+        rows = [('load_ms', baseline[name]['load_ms'], current[name]['load_ms'])]
+        rows += [(f'{phase} {p}', baseline[name][phase][p], current[name][phase][p]) for phase in PHASES for p in ('p50', 'p95', 'p99')]
+        for metric, old, new in rows:
+            change = (new - old) / old if old else 0.0
+            flag = ''
+            if change > args.threshold:
+                flag = '  REGRESSION'
+                regressions.append((name, metric))
+            print(f'{name:<8} {metric:<12} {old:>10.3f} {new:>10.3f} {change:>+7.1%}{flag}')
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless frame-time benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run scenarios and optionally save results as JSON')
+    run_parser.add_argument('--frames', type=int, default=300)
+    run_parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS))
+    run_parser.add_argument('-o', '--output')
+
+    compare_parser = commands.add_parser('compare', help='compare two saved runs')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='relative slowdown that counts as a regression')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+if __name__ == '__main__':
+    main()
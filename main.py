@@ -1,4 +1,9 @@
+import time
+
+# Taken before the game's imports so the startup report covers them
+started = time.perf_counter()
+
 from src.game import main
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main(started)
\ No newline at end of file
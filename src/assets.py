@@ -0,0 +1,107 @@
+import os
+import threading
+import pygame
+
+def can_convert():
+    """Whether surfaces may be converted to the display format here and now"""
+    return pygame.display.get_surface() is not None and threading.current_thread() is threading.main_thread()
+
+class AssetManager:
+    """Loads each image once and hands out shared surfaces keyed by (path, size, flip)"""
+
+    def __init__(self, directory='images'):
+        self.directory = directory
+        self._images = {}
+        self._scaled = {}  # (image, scale) -> copy for a low-resolution render target
+        self.hits = 0
+        self.misses = 0
+
+    def get_image(self, path, size=None, flip=False):
+        """Return the shared surface for path, scaled to size and optionally mirrored"""
+        key = (path, tuple(size) if size else None, bool(flip))
+        image = self._images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+        self.misses += 1
+        return self._lookup(key)
+
+    def preload(self, directory=None, variants=()):
+        """Load every image in directory plus any (path, size, flip) variants up front"""
+        directory = directory or self.directory
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
+                self._lookup((f'{directory}/{name}', None, False))
+        for path, size, flip in variants:
+            self._lookup((path, tuple(size) if size else None, bool(flip)))
+
+    def scaled(self, image, scale):
+        """Copy of image resized by scale, made once per image and scale"""
+        key = (image, scale)
+        copy = self._scaled.get(key)
+        if copy is None:
+            width, height = image.get_size()
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            try:
+                copy = pygame.transform.smoothscale(image, size)
+            except ValueError:  # smoothscale needs 24 or 32 bit surfaces
+                copy = pygame.transform.scale(image, size)
+            self._scaled[key] = copy
+        return copy
+
+    def prescale(self, scale, variants=()):
+        """Make the scale copies of (path, size, flip) variants ahead of the first frame that needs them"""
+        for path, size, flip in variants:
+            self.scaled(self.get_image(path, size, flip), scale)
+
+    def discard(self, path, size=None, flip=False):
+        """Drop one cached variant whose only user keeps its own copy of it"""
+        self._images.pop((path, tuple(size) if size else None, bool(flip)), None)
+
+    def clear(self):
+        self._images.clear()
+        self._scaled.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Cache hits, misses, entry count and the number of pixel bytes held"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._images),
+            'scaled': len(self._scaled),
+            'bytes': sum(image.get_pitch() * image.get_height()
+                         for image in list(self._images.values()) + list(self._scaled.values()))
+        }
+
+    def _lookup(self, key):
+        return self._resolve(key)[0]
+
+    def _resolve(self, key):
+        # Returns (image, final); only final images go into the cache
+        image = self._images.get(key)
+        if image is not None:
+            return image, True
+        path, size, flip = key
+        if flip:
+            base, final = self._resolve((path, size, False))
+            image = pygame.transform.flip(base, True, False)
+        elif size is not None:
+            base, final = self._resolve((path, None, False))
+            image = pygame.transform.scale(base, size)
+        else:
+            image = pygame.image.load(path)
+            final = True
+            if pygame.display.get_surface() is not None:
+                if threading.current_thread() is threading.main_thread():
+                    image = image.convert_alpha()
+                else:
+                    # Only the main thread converts; leave the key empty so it converts it later
+                    final = False
+        if final:
+            self._images[key] = image
+        return image, final
+
+# Shared cache used by every sprite
+assets = AssetManager()
@@ -0,0 +1,81 @@
+import pygame
+from .settings import SOUND_EFFECTS, SOUND_GROUPS
+
+class SoundBank:
+    """Sound effects decoded once, played on reserved channel groups with per-sound voice limits"""
+
+    def __init__(self, effects=SOUND_EFFECTS, groups=SOUND_GROUPS):
+        self.effects = effects
+        self.groups = groups
+        self.sounds = {}
+        self.channels = {}  # group -> reserved Channels
+        self.voices = {}  # Channel -> (sound name, priority, start order) of its latest sound
+        self._started = 0
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def load(self):
+        """Decode every sound file once and reserve each group's channels; False when there is no mixer"""
+        if not pygame.mixer.get_init():
+            return False
+        reserved = sum(self.groups.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved))
+        pygame.mixer.set_reserved(reserved)
+        first = 0
+        for group, count in self.groups.items():
+            self.channels[group] = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+            first += count
+        decoded = {}  # path -> Sound, so effects sharing a file share one decode
+        for name, (path, _, _, _) in self.effects.items():
+            if path not in decoded:
+                decoded[path] = pygame.mixer.Sound(path)
+            self.sounds[name] = decoded[path]
+        return True
+
+    def play(self, name):
+        """Start a sound on its group, stealing a voice if needed; returns the Channel or None"""
+        sound = self.sounds.get(name)
+        if sound is None:
+            return None
+        _, group, limit, priority = self.effects[name]
+        channels = self.channels[group]
+        voices = self.voices
+        busy = [channel for channel in channels if channel.get_busy()]
+        same = [channel for channel in busy if voices[channel][0] == name]
+        if len(same) >= limit:
+            # At its voice limit a sound restarts its own oldest voice
+            channel = min(same, key=lambda c: voices[c][2])
+            self.stolen += 1
+        elif len(busy) < len(channels):
+            channel = next(channel for channel in channels if not channel.get_busy())
+        else:
+            # Group full: take the oldest of the least important voices, unless they outrank this one
+            channel = min(busy, key=lambda c: (voices[c][1], voices[c][2]))
+            if voices[channel][1] > priority:
+                self.dropped += 1
+                return None
+            self.stolen += 1
+        channel.play(sound)
+        self._started += 1
+        voices[channel] = (name, priority, self._started)
+        self.played += 1
+        return channel
+
+    def play_music(self, path, loops=-1):
+        """Stream background music, carrying on silently if it is missing"""
+        if not pygame.mixer.get_init():
+            return False
+        try:
+            pygame.mixer.music.load(path)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f'No background music: {e}')
+            return False
+        pygame.mixer.music.play(loops)
+        return True
+
+    def stats(self):
+        return {'sounds': len(self.sounds), 'played': self.played, 'stolen': self.stolen, 'dropped': self.dropped}
+
+# Shared sound bank used by the game loop
+audio = SoundBank()
@@ -0,0 +1,56 @@
+from .settings import WINDOW_WIDTH, BACKGROUND_LAYERS
+from .assets import assets, can_convert
+
+class ParallaxLayer:
+    """Background image tiled horizontally and scrolled at a fraction of the camera speed"""
+
+    def __init__(self, path, size, speed, y=0, opaque=True):
+        self.path = path
+        self.size = size
+        self.speed = speed
+        self.y = y
+        self.opaque = opaque
+        self._tiles = {}  # scale -> tile
+
+    def tile(self, scale=1):
+        """The display-format tile resized by scale, converted once the first time it is drawn"""
+        tile = self._tiles.get(scale)
+        if tile is None:
+            size = self.size
+            if scale != 1:
+                size = (round(size[0] * scale), round(size[1] * scale))
+            tile = assets.get_image(self.path, size)
+            if self.opaque and can_convert():
+                # An opaque tile blits without per-pixel alpha; the per-pixel alpha original is not needed again
+                tile = tile.convert()
+                assets.discard(self.path, size)
+            self._tiles[scale] = tile
+        return tile
+
+    def draw(self, surface, camera_x, view_width=WINDOW_WIDTH, scale=1):
+        """Blit just the columns of the tile that fall inside the view, all sizes multiplied by scale"""
+        tile = self.tile(scale)
+        width, height = tile.get_size()
+        source_x = int(camera_x * self.speed * scale) % width
+        view_width = round(view_width * scale)
+        y = round(self.y * scale)
+        x = 0
+        while x < view_width:
+            span = min(width - source_x, view_width - x)
+            surface.blit(tile, (x, y), (source_x, 0, span, height))
+            x += span
+            source_x = 0
+
+class ParallaxBackground:
+    """Back-to-front stack of parallax layers"""
+
+    def __init__(self, layers=BACKGROUND_LAYERS):
+        self.layers = [ParallaxLayer(*layer) for layer in layers]
+
+    def preload(self, scale=1):
+        for layer in self.layers:
+            layer.tile(scale)
+
+    def draw(self, surface, camera_x, scale=1):
+        for layer in self.layers:
+            layer.draw(surface, camera_x, scale=scale)
@@ -0,0 +1,271 @@
+try:
+    import numpy as np
+except ImportError:  # The batched backend is optional; the sprite classes work without it
+    np = None
+from .settings import ANIMATION_FRAME_TICKS, SPATIAL_CELL_SIZE
+from .collision import swept_x
+
+def available():
+    """Whether NumPy is installed, so EntityBatch can be used"""
+    return np is not None
+
+def _round(values):
+    # Half away from zero, like assigning to a pygame Rect; NumPy's round() goes half to even
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+def _grid(x, y, w, h, cell):
+    # Sorted (cell key, row) pairs for every grid cell each rect touches
+    rows, cx, cy = _cells(x, y, w, h, cell)
+    keys = _keys(cx, cy)
+    order = np.lexsort((rows, keys))
+    return keys[order], rows[order]
+
+def _cells(x, y, w, h, cell):
+    x0 = x // cell
+    y0 = y // cell
+    nx = (x + np.maximum(w, 1) - 1) // cell - x0 + 1
+    ny = (y + np.maximum(h, 1) - 1) // cell - y0 + 1
+    counts = nx * ny
+    rows = np.repeat(np.arange(len(x)), counts)
+    local = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return rows, x0[rows] + local // ny[rows], y0[rows] + local % ny[rows]
+
+def _keys(cx, cy):
+    return (cx + (1 << 20)) * (1 << 22) + (cy + (1 << 20))
+
+def _pairs(grid, bx, by, bw, bh, x, y, w, h, cell):
+    """(row, grid row) pairs of rects x/y/w/h colliding with the gridded rects bx/by/bw/bh"""
+    keys, grid_rows = grid
+    rows, cx, cy = _cells(x, y, w, h, cell)
+    query = _keys(cx, cy)
+    lo = np.searchsorted(keys, query, 'left')
+    counts = np.searchsorted(keys, query, 'right') - lo
+    rows = np.repeat(rows, counts)
+    others = grid_rows[np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(len(rows))]
+    # Same test as pygame's Rect.colliderect
+    hit = ((x[rows] < bx[others] + bw[others]) & (bx[others] < x[rows] + w[rows])
+           & (y[rows] < by[others] + bh[others]) & (by[others] < y[rows] + h[rows]))
+    return rows[hit], others[hit]
+
+def _run_starts(*columns):
+    # Mask of rows that differ from the previous row in any column
+    starts = np.zeros(len(columns[0]), bool)
+    starts[:1] = True
+    for column in columns:
+        starts[1:] |= column[1:] != column[:-1]
+    return starts
+
+class EntityBatch:
+    """Enemy and projectile state held as NumPy arrays and advanced in one vectorized step
+
+    Behaves exactly like Enemy.update and Projectile.update; the sprites stay the
+    public view and are written back after each step so drawing, the player's
+    collisions and snapshots see the same state.
+    """
+
+    def __init__(self, enemies, projectiles, platforms, cell_size=SPATIAL_CELL_SIZE):
+        if np is None:
+            raise ImportError('the batched entity backend needs numpy')
+        self.enemies = enemies
+        self.projectiles = projectiles
+        self.platforms = platforms
+        self.cell_size = cell_size
+        self._enemy_version = None
+        self._platform_version = None
+        self._candidate_x = None  # Enemy x positions the platform candidates were found at
+        self._sprites = []
+        self.navigators = []  # Enemies that move themselves, such as chasers
+
+    def invalidate(self):
+        """Re-read every enemy from its sprite before the next step"""
+        self._enemy_version = None
+
+    def update_enemies(self, dt=1):
+        """Vectorized Enemy.update for every member of the enemy group"""
+        self._sync()
+        if not self._sprites:
+            return
+        for _ in range(dt):
+            self._patrol()
+
+    def _patrol(self, dt=1):
+        x = self.x + _round(self.speed * self.direction * dt)
+        direction = self.direction.copy()
+        facing = self.facing.copy()
+
+        # Patrol boundaries
+        left = x < self.start_x - self.patrol
+        right = ~left & (x > self.start_x + self.patrol)
+        direction[left] = 1
+        facing[left] = True
+        direction[right] = -1
+        facing[right] = False
+
+        # Platform edges, against the first colliding platform in insertion order
+        if len(self.px):
+            rows, platforms = self._candidates(x)
+            px, py, pw, ph = self.px[platforms], self.py[platforms], self.pw[platforms], self.ph[platforms]
+            hit = ((x[rows] < px + pw) & (px < x[rows] + self.w[rows])
+                   & (self.y[rows] < py + ph) & (py < self.y[rows] + self.h[rows]))
+            rows, px, pw = rows[hit], px[hit], pw[hit]
+            # Candidates are sorted by (enemy, platform), so each enemy's first hit is its first row
+            first = _run_starts(rows)
+            rows, px, pw = rows[first], px[first], pw[first]
+            d = direction[rows]
+            turn_left = (d > 0) & (x[rows] + self.w[rows] >= px + pw)
+            turn_right = ~turn_left & (d < 0) & (x[rows] <= px)
+            direction[rows[turn_left]] = -1
+            facing[rows[turn_left]] = False
+            direction[rows[turn_right]] = 1
+            facing[rows[turn_right]] = True
+
+        # Animation frames; single-frame animations never tick
+        ticks = self.ticks + (self.n_frames > 1) * dt
+        wrap = ticks >= ANIMATION_FRAME_TICKS
+        ticks[wrap] = 0
+        frame = np.where(wrap, (self.frame + 1) % self.n_frames, self.frame)
+
+        self._write_back(x, direction, facing, ticks, frame)
+
+    def update_projectiles(self, view_left, view_right, dt=1):
+        """Vectorized Projectile.update for every member of the projectile group"""
+        projectiles = list(self.projectiles)
+        if not projectiles:
+            return
+        count = len(projectiles)
+        dx = _round(np.fromiter((p.speed * p.direction * dt for p in projectiles), np.float64, count))
+        x = np.fromiter((p.rect.x for p in projectiles), np.int64, count) + dx
+        y = np.fromiter((p.rect.y for p in projectiles), np.int64, count)
+        w = np.fromiter((p.rect.w for p in projectiles), np.int64, count)
+        h = np.fromiter((p.rect.h for p in projectiles), np.int64, count)
+        for projectile, new_x in zip(projectiles, x.tolist()):
+            projectile.rect.x = new_x
+        # Hit boxes also cover whatever a projectile flew past, like swept_x
+        sx = np.where(dx > w, x + w - dx, x)
+        sw = np.where(np.abs(dx) > w, np.abs(dx), w)
+
+        self._sync()
+        if self._sprites:
+            killed = set()
+            # Only enemies overlapping the projectiles' bounding box can be hit
+            near = np.flatnonzero((self.x < (sx + sw).max()) & (sx.min() < self.x + self.w)
+                                  & (self.y < (y + h).max()) & (y.min() < self.y + self.h))
+            ex, ey, ew, eh = self.x[near, None], self.y[near, None], self.w[near, None], self.h[near, None]
+            enemies, rows = np.nonzero((sx < ex + ew) & (ex < sx + sw) & (y < ey + eh) & (ey < y + h))
+            enemies = near[enemies]
+            if len(rows):
+                # Projectiles resolve in group order; an enemy killed by one is gone for the next
+                hits = {}
+                for row, enemy in zip(rows.tolist(), enemies.tolist()):
+                    hits.setdefault(row, []).append(enemy)
+                for row in sorted(hits):
+                    victims = [enemy for enemy in hits[row] if enemy not in killed]
+                    if victims:
+                        killed.update(victims)
+                        projectiles[row].kill()
+                self._kill(sorted(killed))
+
+        # Enemies outside the arrays are hit the way Projectile.update does it
+        if self.navigators:
+            for projectile, moved in zip(projectiles, dx.tolist()):
+                if not projectile.alive():
+                    continue
+                hits = [enemy for enemy in self.enemies.colliding(swept_x(projectile.rect, moved)) if not enemy.batched]
+                for enemy in hits:
+                    enemy.kill()
+                if hits:
+                    projectile.kill()
+
+        # Same view cull as Projectile.update, for the ones that hit nothing
+        expired = np.flatnonzero((x + w < view_left) | (x > view_right))
+        for i in expired.tolist():
+            projectiles[i].kill()
+
+    def _candidates(self, x):
+        # Platform pairs found with every enemy widened by one cell stay valid until an enemy moves a cell
+        if self._candidate_x is None or np.abs(x - self._candidate_x).max() > self.cell_size:
+            margin = self.cell_size
+            rows, platforms = _pairs(self._platform_grid, self.px, self.py, self.pw, self.ph,
+                                     x - margin, self.y, self.w + 2 * margin, self.h, self.cell_size)
+            order = np.lexsort((platforms, rows))
+            # A wide platform is found once per cell it shares with the enemy
+            rows, platforms = rows[order], platforms[order]
+            unique = _run_starts(rows, platforms)
+            self._candidate_pairs = rows[unique], platforms[unique]
+            self._candidate_x = x
+        return self._candidate_pairs
+
+    def _sync(self):
+        if self._platform_version != self.platforms.version:
+            self._load_platforms()
+        if self._enemy_version != self.enemies.version:
+            self._load_enemies()
+
+    def _load_platforms(self):
+        rects = [platform.rect for platform in self.platforms]
+        self.px, self.py, self.pw, self.ph = (np.array([r[i] for r in rects], np.int64) for i in range(4))
+        self._platform_grid = _grid(self.px, self.py, self.pw, self.ph, self.cell_size)
+        self._platform_version = self.platforms.version
+        self._candidate_x = None
+
+    def _load_enemies(self):
+        sprites = self._sprites = [enemy for enemy in self.enemies if enemy.batched]
+        self.navigators = [enemy for enemy in self.enemies if not enemy.batched]
+        count = len(sprites)
+
+        def column(read, dtype=np.int64):
+            return np.fromiter((read(s) for s in sprites), dtype, count)
+
+        self.x = column(lambda s: s.rect.x)
+        self.y = column(lambda s: s.rect.y)
+        self.w = column(lambda s: s.rect.w)
+        self.h = column(lambda s: s.rect.h)
+        self.speed = column(lambda s: s.speed)
+        self.direction = column(lambda s: s.direction)
+        self.start_x = column(lambda s: s.start_x)
+        self.patrol = column(lambda s: s.patrol_distance)
+        self.facing = column(lambda s: s.facing_right, bool)
+        self.ticks = column(lambda s: s.frame_ticks)
+        self.frame = column(lambda s: s.frame_index)
+        self.n_frames = column(lambda s: len(s.frames[('walk', True)]))
+        self._enemy_version = self.enemies.version
+        self._candidate_x = None
+
+    def _write_back(self, x, direction, facing, ticks, frame):
+        sprites = self._sprites
+        for sprite, new_x in zip(sprites, x.tolist()):
+            sprite.rect.x = new_x
+        turned = np.flatnonzero((direction != self.direction) | (facing != self.facing))
+        for i in turned.tolist():
+            sprite = sprites[i]
+            sprite.direction = int(direction[i])
+            sprite.facing_right = bool(facing[i])
+        animated = np.flatnonzero(self.n_frames > 1)
+        for i in animated.tolist():
+            sprites[i].frame_ticks = int(ticks[i])
+            sprites[i].frame_index = int(frame[i])
+        for i in np.union1d(turned, animated).tolist():
+            sprites[i].sync_image()
+
+        # Refile only the enemies that crossed into another grid column
+        cell = self.enemies.index.cell_size
+        moved = np.flatnonzero((x // cell != self.x // cell)
+                               | ((x + self.w - 1) // cell != (self.x + self.w - 1) // cell))
+        move = self.enemies.index.move
+        for i in moved.tolist():
+            move(sprites[i])
+
+        self.x, self.direction, self.facing, self.ticks, self.frame = x, direction, facing, ticks, frame
+
+    def _kill(self, rows):
+        if not rows:
+            return
+        for row in rows:
+            self._sprites[row].kill()
+        keep = np.ones(len(self._sprites), bool)
+        keep[rows] = False
+        self._sprites = [sprite for sprite, kept in zip(self._sprites, keep.tolist()) if kept]
+        for name in ('x', 'y', 'w', 'h', 'speed', 'direction', 'start_x', 'patrol', 'facing', 'ticks', 'frame', 'n_frames'):
+            setattr(self, name, getattr(self, name)[keep])
+        self._enemy_version = self.enemies.version
+        self._candidate_x = None
@@ -0,0 +1,97 @@
+import pygame
+from .settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from .assets import assets
+
+class Camera:
+    """Viewport into the level in world coordinates"""
+
+    def __init__(self, width=WINDOW_WIDTH, height=WINDOW_HEIGHT):
+        self.rect = pygame.Rect(0, 0, width, height)
+
+    @property
+    def x(self):
+        return self.rect.x
+
+    def follow(self, camera_x):
+        self.rect.x = int(camera_x)
+
+class Renderer:
+    """Draws world layers through a camera, culling everything outside the view
+
+    The camera works in logical (window) coordinates; with a scale below 1 the
+    target is a smaller surface and positions and images are resized to fit.
+    """
+
+    def __init__(self, screen, camera, scale=1):
+        self.screen = screen
+        self.camera = camera
+        self.scale = scale
+        self.drawn = 0
+        self.culled = 0
+
+    def set_target(self, screen, scale):
+        self.screen = screen
+        self.scale = scale
+
+    def begin_frame(self):
+        self.drawn = 0
+        self.culled = 0
+
+    def visible(self, group):
+        """Members of group inside the view, using its spatial index when it has one"""
+        view = self.camera.rect
+        if hasattr(group, 'colliding'):
+            return group.colliding(view)
+        return [sprite for sprite in group if view.colliderect(sprite.rect)]
+
+    def draw_layer(self, group):
+        """Blit the visible members of group in a single batch"""
+        visible = self.visible(group)
+        self.drawn += len(visible)
+        self.culled += len(group) - len(visible)
+        if visible:
+            offset_x = self.camera.rect.x
+            offset_y = self.camera.rect.y
+            scale = self.scale
+            if scale == 1:
+                self.screen.blits(
+                    [(sprite.image, (sprite.rect.x - offset_x, sprite.rect.y - offset_y)) for sprite in visible],
+                    False
+                )
+            else:
+                scaled = assets.scaled
+                self.screen.blits(
+                    [(scaled(sprite.image, scale), (round((sprite.rect.x - offset_x) * scale),
+                                                     round((sprite.rect.y - offset_y) * scale)))
+                     for sprite in visible],
+                    False
+                )
+
+    def draw_static(self, layer):
+        """Blit the baked level chunks overlapping the view"""
+        view = self.camera.rect
+        scale = self.scale
+        chunks = layer.visible(view, scale)
+        self.drawn += len(chunks)
+        self.culled += len(layer) - len(chunks)
+        if scale == 1:
+            self.screen.blits([(surface, (area.x - view.x, area.y - view.y)) for area, surface in chunks], False)
+        else:
+            self.screen.blits([(surface, (round((area.x - view.x) * scale), round((area.y - view.y) * scale)))
+                               for area, surface in chunks], False)
+
+    def draw_sprite(self, sprite, pos=None):
+        """Blit a single sprite, optionally at an interpolated world position"""
+        if sprite is None:
+            return
+        if not self.camera.rect.colliderect(sprite.rect):
+            self.culled += 1
+            return
+        self.drawn += 1
+        x, y = pos if pos is not None else sprite.rect.topleft
+        if self.scale == 1:
+            self.screen.blit(sprite.image, (x - self.camera.rect.x, y - self.camera.rect.y))
+        else:
+            scale = self.scale
+            self.screen.blit(assets.scaled(sprite.image, scale),
+                             (round((x - self.camera.rect.x) * scale), round((y - self.camera.rect.y) * scale)))
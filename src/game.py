@@ -1,28 +1,121 @@
+import argparse
 import pygame
 import sys
+import time
 from .settings import (
-    WINDOW_WIDTH, WINDOW_HEIGHT, FPS, BLUE, WHITE, BLACK,
+    WINDOW_WIDTH, WINDOW_HEIGHT, FPS, BLUE,
     MENU, PLAYING, PAUSED, GAME_OVER, LEVEL_COMPLETE,
-    FONT, background_image
+    SOUND_EFFECTS, BACKGROUND_MUSIC, PREFETCH_PROGRESS, IDLE_WAIT_MS, RENDER_SCALE, RENDER_SCALE_AUTO, HOT_RELOAD
 )
-from .sprites import Player, Heart
-from .ui import Button, draw_menu, draw_pause_menu, draw_game_over, draw_level_complete
-from .level_manager import load_level, get_max_level
+from .sprites import SPRITE_VARIANTS
+from .assets import assets
+from .camera import Camera, Renderer
+from .render_target import RenderTarget
+from .background import ParallaxBackground
+from .ui import Button, StaticScreen, draw_menu, draw_pause_menu, draw_game_over, draw_level_complete, draw_hud, show_status
+from .level_manager import get_max_level
+from .level_loader import LevelPrefetcher
+from .simulation import World, InputState, FixedStepClock
+from .profiler import profiler, StartupTimer, CpuMeter
+from .runtime import init
+from .audio import audio
+from .replay import InputRecorder
+from .hot_reload import LevelReloader
+
+# Shared parallax layers; tiles are loaded and converted on first draw
+background = ParallaxBackground()
+
+# States whose screen only changes on input
+IDLE_STATES = (MENU, PAUSED, GAME_OVER, LEVEL_COMPLETE)
+
+def wait_events(timeout):
+    """Sleep until an event arrives or timeout ms pass, then return everything queued"""
+    first = pygame.event.wait(timeout)
+    events = [] if first.type == pygame.NOEVENT else [first]
+    return events + pygame.event.get()
+
+def draw_paused(screen, buttons):
+    # Draw game in background
+    screen.fill(BLUE)
+    draw_pause_menu(screen, buttons)
+
+def prepare_scale(scale):
+    """Resize the sprites and background for a render scale before a frame needs them"""
+    if scale != 1:
+        assets.prescale(scale, SPRITE_VARIANTS)
+    background.preload(scale)
+
+def draw_world(target, renderer, world, alpha, current_level):
+    """Draw one PLAYING frame: background, world layers and player at the target's scale, then hearts and HUD"""
+    camera = renderer.camera
+    player = world.player
+    screen = target.window
+
+    # Draw background with parallax effect
+    camera.follow(world.camera_x(alpha))
+    background.draw(target.surface, camera.x, target.scale)
+    
+    # Draw only what the camera sees, one batch per layer
+    renderer.begin_frame()
+    renderer.draw_static(world.static_layer)
+    renderer.draw_layer(world.projectiles)
+    renderer.draw_layer(world.enemies)
+    renderer.draw_layer(world.coins)
+    renderer.draw_sprite(world.level_end)
+    
+    # Draw player, then hearts on top of the upscaled frame
+    renderer.draw_sprite(player, world.player_pos(alpha))
+    target.present()
+    player.hearts.draw(screen)
+    
+    # Draw UI elements (these don't move with camera)
+    draw_hud(screen, player.coins, current_level)
+
+def main(started=None):
+    """Run the game; started is the perf_counter() time the launcher began importing"""
+    parser = argparse.ArgumentParser(description="Sonchi's Adventure")
+    parser.add_argument('--record', metavar='LOG', help='write every level played to an input log for src.replay')
+    parser.add_argument('--busy-menus', action='store_true', help='redraw menus and overlays every frame like gameplay')
+    parser.add_argument('--render-scale', type=float, default=RENDER_SCALE,
+                        help='draw the world at this fraction of the window resolution, e.g. 0.5')
+    parser.add_argument('--auto-scale', action='store_true', default=RENDER_SCALE_AUTO,
+                        help='lower the render scale while frames run over budget')
+    parser.add_argument('--hot-reload', action='store_true', default=HOT_RELOAD,
+                        help='apply edits of the current level file while playing it')
+    args = parser.parse_args()
+    recorder = InputRecorder() if args.record else None
+
+    startup = StartupTimer(started)
+    startup.mark('imports')
 
-def main():
     # Initialize Pygame
-    pygame.init()
+    init()
+    startup.mark('init')
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption("Sonchi's Adventure")
     clock = pygame.time.Clock()
+    target = RenderTarget(screen, args.render_scale, args.auto_scale)
+    startup.mark('display')
+
+    # Decode and convert every image once, now that a display mode exists
+    assets.preload(variants=SPRITE_VARIANTS)
+    for scale in target.scales if target.auto else [target.scale]:
+        prepare_scale(scale)
+    audio.load()
+    startup.mark('assets')
+    camera = Camera()
+    renderer = Renderer(target.surface, camera, target.scale)
 
     # Initialize game state
     game_state = MENU
     current_level = 1
     max_level = get_max_level()
-    player = None
-    projectiles = pygame.sprite.Group()
-    all_sprites = pygame.sprite.Group()
+    world = None
+    reloader = None
+    step_clock = FixedStepClock()
+    prefetcher = LevelPrefetcher()
+    jump_pressed = False
+    shoot_pressed = False
     
     # Create menu buttons
     menu_buttons = [
@@ -35,151 +128,196 @@ def main():
         Button(WINDOW_WIDTH//2 - 100, WINDOW_HEIGHT//2 + 20, 200, 50, "Quit to Menu")
     ]
 
+    # Menus and overlays are drawn once and then patched where a button's hover changes
+    idle_screens = {
+        MENU: StaticScreen(lambda surface: draw_menu(surface, menu_buttons), menu_buttons),
+        PAUSED: StaticScreen(lambda surface: draw_paused(surface, pause_buttons), pause_buttons),
+        GAME_OVER: StaticScreen(draw_game_over),
+        LEVEL_COMPLETE: StaticScreen(draw_level_complete)
+    }
+    idle_cpu = CpuMeter()
+    was_idle = False
+    drawn_state = None
+
     # Load background music
-    pygame.mixer.music.load('sounds/background.wav')
-    pygame.mixer.music.play(-1)  # Loop indefinitely
-
-    # Load first level
-    level_data = load_level(current_level)
-    platforms = level_data['platforms']
-    enemies = level_data['enemies']
-    coins = level_data['coins']
-    level_end = level_data['level_end']
+    audio.play_music(BACKGROUND_MUSIC)  # Loop indefinitely
+
+    # Build the first level, navigation graph included, on the worker while the menu is up
+    prefetcher.prefetch(current_level)
+    level_data = None
     
     # Main game loop
     running = True
     while running:
+        # Idle screens block until there is input instead of spinning at FPS
+        idle = game_state in IDLE_STATES and not profiler.show_overlay and not args.busy_menus
+        if game_state in IDLE_STATES:
+            idle_cpu.start()
+        else:
+            idle_cpu.stop()
+
         # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+        with profiler.scope('events'):
+            for event in wait_events(IDLE_WAIT_MS) if idle else pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    drawn_state = None
             
-            elif game_state == MENU:
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    for button in menu_buttons:
-                        if button.is_clicked(event.pos):
-                            if button.text == "Start Game":
-                                game_state = PLAYING
-                                player = Player(100, 500)
-                                all_sprites.add(player)
-                            elif button.text == "Quit":
-                                running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
             
-            elif game_state == PLAYING:
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        game_state = PAUSED
-                    elif event.key == pygame.K_SPACE:
-                        if player:
-                            player.jump()
-                    elif event.key == pygame.K_x:
-                        if player:
-                            projectile = player.shoot()
-                            if projectile:
-                                projectiles.add(projectile)
-                                all_sprites.add(projectile)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    profiler.capture(time.strftime('trace-%Y%m%d-%H%M%S.json'))
             
-            elif game_state == PAUSED:
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    game_state = PLAYING
-                for button in pause_buttons:
-                    if button.handle_event(event):
-                        if button.text == "Resume":
-                            game_state = PLAYING
-                        elif button.text == "Quit to Menu":
-                            game_state = MENU
+                elif game_state == MENU:
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        for button in menu_buttons:
+                            if button.is_clicked(event.pos):
+                                if button.text == "Start Game":
+                                    # Waits for the prefetch if it is still building; a run changes the sprites, so each start takes a fresh copy
+                                    level_data = prefetcher.take(current_level)
+                                    if level_data is None:
+                                        continue
+                                    game_state = PLAYING
+                                    if recorder:
+                                        recorder.begin_level(current_level)
+                                    world = World(level_data)
+                                    if args.hot_reload:
+                                        reloader = LevelReloader(world, f'level{current_level}.json', level_data['compiled'])
+                                    step_clock.reset()
+                                elif button.text == "Quit":
+                                    running = False
+            
+                elif game_state == PLAYING:
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            game_state = PAUSED
+                        elif event.key == pygame.K_SPACE:
+                            jump_pressed = True
+                        elif event.key == pygame.K_x:
+                            shoot_pressed = True
             
-            elif game_state == GAME_OVER:
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        # Restart the current level
-                        level_data = load_level(current_level)
-                        platforms = level_data['platforms']
-                        enemies = level_data['enemies']
-                        coins = level_data['coins']
-                        level_end = level_data['level_end']
-                        player = Player(100, 500)
-                        all_sprites = pygame.sprite.Group()
-                        all_sprites.add(player)
-                        projectiles = pygame.sprite.Group()
+                elif game_state == PAUSED:
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                         game_state = PLAYING
+                    for button in pause_buttons:
+                        if button.handle_event(event):
+                            if button.text == "Resume":
+                                game_state = PLAYING
+                            elif button.text == "Quit to Menu":
+                                if recorder:
+                                    recorder.end_level(world)
+                                prefetcher.prefetch(current_level)
+                                game_state = MENU
             
-            elif game_state == LEVEL_COMPLETE:
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        current_level += 1
-                        if current_level > max_level:
-                            game_state = MENU
-                        else:
-                            level_data = load_level(current_level)
-                            platforms = level_data['platforms']
-                            enemies = level_data['enemies']
-                            coins = level_data['coins']
-                            level_end = level_data['level_end']
-                            player = Player(100, 500)
-                            all_sprites = pygame.sprite.Group()
-                            all_sprites.add(player)
-                            projectiles = pygame.sprite.Group()
+                elif game_state == GAME_OVER:
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_RETURN:
+                            # Restart the current level from its snapshot
+                            world.restart()
+                            if recorder:
+                                recorder.restart()
+                            step_clock.reset()
                             game_state = PLAYING
-
-        # Update
-        if game_state == PLAYING and player is not None:
-            # Update game objects
-            player.update(platforms, projectiles, enemies, coins, level_end)
-            enemies.update(platforms)
-            projectiles.update(enemies)
             
-            # Check for level completion
-            if level_end and pygame.sprite.collide_rect(player, level_end):
-                game_state = LEVEL_COMPLETE
-            
-            # Check for game over
-            if player.lives <= 0:
-                game_state = GAME_OVER
+                elif game_state == LEVEL_COMPLETE:
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_RETURN:
+                            current_level += 1
+                            if recorder:
+                                recorder.end_level(world)
+                            level_data = prefetcher.take(current_level) if current_level <= max_level else None
+                            if level_data is None:
+                                # The series is over, or the next level failed to load; start again from the first
+                                current_level = 1
+                                prefetcher.prefetch(current_level)
+                                world = None
+                                reloader = None
+                                game_state = MENU
+                            else:
+                                if recorder:
+                                    recorder.begin_level(current_level)
+                                world = World(level_data, world.player)
+                                if args.hot_reload:
+                                    reloader = LevelReloader(world, f'level{current_level}.json', level_data['compiled'])
+                                step_clock.reset()
+                                game_state = PLAYING
+
+        # Update in fixed steps; key presses are consumed by the first step that sees them
+        frame_time = clock.tick() / 1000.0 if idle else clock.tick(FPS) / 1000.0
+        if was_idle:
+            # Time spent waiting on a menu is not game time
+            frame_time = min(frame_time, 1.0 / FPS)
+        elif game_state == PLAYING and target.adapt(clock.get_rawtime() / 1000.0):
+            # The last frames ran over budget or had plenty to spare
+            renderer.set_target(target.surface, target.scale)
+        was_idle = idle
+        if game_state == PLAYING and world is not None:
+            if reloader is not None:
+                change = reloader.poll()
+                if change:
+                    show_status(change)
+            keys = pygame.key.get_pressed()
+            for _ in range(step_clock.advance(frame_time)):
+                inputs = InputState(keys[pygame.K_LEFT], keys[pygame.K_RIGHT], jump_pressed, shoot_pressed)
+                jump_pressed = False
+                shoot_pressed = False
+                if recorder:
+                    recorder.record(inputs)
+                for sim_event in world.step(inputs):
+                    if sim_event == 'level_complete':
+                        game_state = LEVEL_COMPLETE
+                    elif sim_event == 'game_over':
+                        game_state = GAME_OVER
+                    elif sim_event in SOUND_EFFECTS:
+                        audio.play(sim_event)
+                if game_state != PLAYING:
+                    break
+
+            # Start building the next level once the flag is in reach
+            if current_level < max_level and (game_state == LEVEL_COMPLETE or world.progress() >= PREFETCH_PROGRESS):
+                prefetcher.prefetch(current_level + 1)
 
         # Draw
-        if game_state == MENU:
-            draw_menu(screen, menu_buttons)
-        elif game_state == PLAYING and player is not None:
-            # Draw background with parallax effect
-            screen.blit(background_image, (-player.camera_x * 0.5, 0))
-            
-            # Draw all sprites with camera offset
-            for platform in platforms:
-                screen.blit(platform.image, (platform.rect.x - player.camera_x, platform.rect.y))
-            for projectile in projectiles:
-                screen.blit(projectile.image, (projectile.rect.x - player.camera_x, projectile.rect.y))
-            for enemy in enemies:
-                screen.blit(enemy.image, (enemy.rect.x - player.camera_x, enemy.rect.y))
-            for coin in coins:
-                screen.blit(coin.image, (coin.rect.x - player.camera_x, coin.rect.y))
-            if level_end:
-                screen.blit(level_end.image, (level_end.rect.x - player.camera_x, level_end.rect.y))
-            
-            # Draw player and hearts
-            screen.blit(player.image, (player.rect.x - player.camera_x, player.rect.y))
-            player.hearts.draw(screen)
-            
-            # Draw UI elements (these don't move with camera)
-            coin_text = FONT.render(f'Coins: {player.coins}', True, WHITE)
-            screen.blit(coin_text, (WINDOW_WIDTH - 150, 10))
-            
-            level_text = FONT.render(f'Level {current_level}', True, WHITE)
-            screen.blit(level_text, (WINDOW_WIDTH // 2 - 50, 10))
-        elif game_state == PAUSED:
-            # Draw game in background
-            screen.fill(BLUE)
-            draw_pause_menu(screen, pause_buttons)
-        elif game_state == GAME_OVER:
-            draw_game_over(screen)
-        elif game_state == LEVEL_COMPLETE:
-            draw_level_complete(screen)
-
-        pygame.display.flip()
-        clock.tick(FPS)
+        dirty = None
+        with profiler.scope('draw'):
+            if game_state == PLAYING and world is not None:
+                draw_world(target, renderer, world, step_clock.alpha, current_level)
+            elif game_state in idle_screens:
+                idle_screen = idle_screens[game_state]
+                if not idle or drawn_state != game_state:
+                    idle_screen.invalidate()
+                dirty = idle_screen.draw(screen)
+            drawn_state = game_state if idle else None
+
+        profiler.draw(screen)
+        with profiler.scope('flip'):
+            if dirty is None:
+                pygame.display.flip()
+            elif dirty:
+                pygame.display.update(dirty)
+        profiler.end_frame()
+        if startup is not None:
+            startup.mark('first frame')
+            print(startup.report())
+            startup = None
 
+    idle_cpu.stop()
+    if idle_cpu.wall:
+        print(f'Idle screens: {idle_cpu.usage():.1%} CPU over {idle_cpu.wall:.1f}s')
+    if target.auto:
+        rejected = ', '.join(f'{scale:g}' for scale in sorted(target.rejected)) or 'none'
+        print(f'Render scale: {target.scale:g} after {target.changes} changes (no gain at: {rejected})')
+    prefetcher.shutdown()
+    if recorder:
+        if world is not None:
+            recorder.end_level(world)
+        recorder.save(args.record)
+        print(f'Wrote input log to {args.record}')
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
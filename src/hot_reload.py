@@ -0,0 +1,447 @@
+"""Development mode that applies edits of the current level's JSON to the running game.
+
+The levels directory is polled for changed modification times; only the
+edited file is recompiled. Its records are matched against the live ones by
+identity: equal records pair up first, then leftover records of the same
+kind pair up in file order as moves, and whatever is left was removed or
+added. Only those entities are touched; the player, untouched sprites and
+the static layer columns nobody edited stay as they are.
+"""
+import os
+import time
+from bisect import bisect_right
+from collections import deque, namedtuple
+from .settings import HOT_RELOAD_INTERVAL, LEVEL_WIDTH, STREAM_MIN_CHUNKS
+from .sprites import Platform, Coin, LevelEnd, make_enemy, needs_navigation
+from .level_compiler import level_cache
+
+ALIGN_EDITS = 16  # Single-record edits stepped over before the rest of a diff is matched by value
+
+class RecordDiff(namedtuple('RecordDiff', ['matches', 'added', 'moved', 'removed'])):
+    """How old records map onto new ones
+
+    matches[old] is the new number of an old record, or None when it was
+    removed; added lists new numbers with no old record, moved and removed
+    hold old numbers.
+    """
+
+    @property
+    def changed(self):
+        return bool(self.added or self.moved or self.removed)
+
+class RecordMatches:
+    """matches of a RecordDiff: runs of records that kept their order, plus records matched one by one
+
+    Lookups cost a binary search, but a diff never builds a list as long as the level.
+    """
+
+    def __init__(self):
+        self.starts = []  # Old number each run starts at, ascending
+        self.runs = []  # (old start, new start, length)
+        self.single = {}  # old number -> new number, outside the runs
+
+    def add_run(self, old, new, length):
+        if length:
+            self.starts.append(old)
+            self.runs.append((old, new, length))
+
+    def __getitem__(self, number):
+        new = self.single.get(number)
+        if new is not None:
+            return new
+        index = bisect_right(self.starts, number) - 1
+        if index >= 0:
+            old, new, length = self.runs[index]
+            if number < old + length:
+                return new + number - old
+        return None
+
+def unchanged(count):
+    """RecordDiff of count records that were left alone"""
+    return RecordDiff(range(count), (), frozenset(), ())
+
+def _same(old, new, i, j, count):
+    # Whether count records from old[i] and new[j] are equal, compared in C
+    if isinstance(old, RecordView):
+        return old.raw.startswith(new.buffer[j * new.size:(j + count) * new.size], i * old.size)
+    return old[i:i + count] == new[j:j + count]
+
+def _common_prefix(old, new, i=0, j=0, limit=None):
+    # Length of the equal run from old[i] and new[j]. Runs double in length until one differs, then a
+    # binary search narrows it down, so a short run costs little however far the records go
+    lo, hi = 0, min(len(old) - i, len(new) - j) if limit is None else limit
+    step = 1
+    while lo < hi:
+        mid = min(lo + step, hi)
+        if not _same(old, new, i + lo, j + lo, mid - lo):
+            hi = mid - 1
+            break
+        lo = mid
+        step *= 2
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _same(old, new, i + lo, j + lo, mid - lo):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _common_suffix(old, new, limit):
+    n, m = len(old), len(new)
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _same(old, new, n - mid, m - mid, mid - lo):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def diff_records(old, new, kind=None):
+    """Match new records to old ones, equal records first and then same-kind leftovers in order"""
+    # An edit usually leaves everything before and after it in place; only the window between is searched
+    head = _common_prefix(old, new)
+    tail = _common_suffix(old, new, min(len(old), len(new)) - head)
+    old_end, new_end = len(old) - tail, len(new) - tail
+    matches = RecordMatches()
+    matches.add_run(0, 0, head)
+
+    # A few edits split the window into equal runs; step over one record at a time while the runs line up
+    old_left, new_left = [], []
+    i = j = head
+    for _ in range(ALIGN_EDITS):
+        if i == old_end or j == new_end:
+            break
+        run, skip_old, skip_new = max(
+            (_common_prefix(old, new, i + skip_old, j + skip_new, min(old_end - i - skip_old, new_end - j - skip_new)),
+             skip_old, skip_new)
+            for skip_old, skip_new in ((1, 1), (1, 0), (0, 1)))
+        old_left += range(i, i + skip_old)
+        new_left += range(j, j + skip_new)
+        i += skip_old
+        j += skip_new
+        matches.add_run(i, j, run)
+        i += run
+        j += run
+    old_left += range(i, old_end)
+    new_left += range(j, new_end)
+    matches.add_run(old_end, new_end, tail)
+
+    waiting = {}
+    for number in new_left:
+        waiting.setdefault(new[number], deque()).append(number)
+    leftover = []
+    for number in old_left:
+        same = waiting.get(old[number])
+        if same:
+            matches.single[number] = same.popleft()
+        else:
+            leftover.append(number)
+
+    # Whatever equal records did not claim is an edit; pair those up by kind
+    by_kind = {}
+    for number in sorted(n for numbers in waiting.values() for n in numbers):
+        by_kind.setdefault(kind(new[number]) if kind else None, deque()).append(number)
+    moved = set()
+    removed = []
+    for number in leftover:
+        candidates = by_kind.get(kind(old[number]) if kind else None)
+        if candidates:
+            matches.single[number] = candidates.popleft()
+            moved.add(number)
+        else:
+            removed.append(number)
+    added = sorted(n for numbers in by_kind.values() for n in numbers)
+    return RecordDiff(matches, added, moved, removed)
+
+class RecordView:
+    """Records of one kind in a CompiledLevel, decoded only when indexed
+
+    diff_records compares runs of them as raw bytes, which is only valid
+    between levels whose enemy type tables agree.
+    """
+
+    def __init__(self, ints, stride, decode):
+        self.ints = ints
+        self.stride = stride
+        self.decode = decode
+        self.raw = ints.tobytes()
+        self.buffer = memoryview(self.raw)
+        self.size = stride * ints.itemsize
+
+    def __len__(self):
+        return len(self.ints) // self.stride
+
+    def __getitem__(self, number):
+        return self.decode(self.ints[number * self.stride:(number + 1) * self.stride].tolist())
+
+def platform_records(compiled):
+    ints = compiled.platforms.tolist()
+    return list(zip(*[iter(ints)] * 4))
+
+def enemy_records(compiled):
+    types = compiled.enemy_types
+    ints = compiled.enemies.tolist()
+    return [(x, y, types[t]) for x, y, t in zip(*[iter(ints)] * 3)]
+
+def coin_records(compiled):
+    ints = compiled.coins.tolist()
+    return list(zip(*[iter(ints)] * 2))
+
+def diff_levels(old, new):
+    """(RecordDiff, new records or None if untouched) for the platforms, enemies and coins of two CompiledLevels"""
+    diffs = []
+    for name, stride, records, kind in (('platforms', 4, platform_records, None),
+                                        ('enemies', 3, enemy_records, _enemy_type),
+                                        ('coins', 2, coin_records, None)):
+        old_ints, new_ints = getattr(old, name), getattr(new, name)
+        if name == 'enemies' and old.enemy_types != new.enemy_types:
+            # Type numbers mean different things in the two levels, so records compare decoded
+            new_records = records(new)
+            diffs.append((diff_records(records(old), new_records, kind), new_records))
+            continue
+        old_records = RecordView(old_ints, stride, _decoder(name, old))
+        new_records = RecordView(new_ints, stride, _decoder(name, new))
+        # Untouched kinds compare as raw bytes, edited ones decode only the records around the edits
+        if old_records.raw == new_records.raw:
+            diffs.append((unchanged(len(new_records)), None))
+        else:
+            diffs.append((diff_records(old_records, new_records, kind), new_records))
+    return diffs
+
+def _decoder(name, compiled):
+    if name == 'enemies':
+        types = compiled.enemy_types
+        return lambda ints: (ints[0], ints[1], types[ints[2]])
+    return tuple
+
+def _enemy_type(record):
+    # Edited enemies may move but never turn into another type
+    return record[2]
+
+def _place_enemy(enemy, record):
+    enemy.place(record[0], record[1])
+
+def _place_coin(coin, record):
+    coin.rect.topleft = record
+
+def _spawn_enemy(record):
+    return make_enemy(*record)
+
+def _spawn_coin(record):
+    return Coin(*record)
+
+class LevelWatcher:
+    """Reports level files whose modification time or size changed, looking at most every interval seconds"""
+
+    def __init__(self, directory, interval=HOT_RELOAD_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.next_check = 0.0
+        self.checks = 0
+        self.seen = self._scan()
+
+    def poll(self, now=None):
+        """Names of level files changed, added or deleted since the last check; empty between checks"""
+        now = time.monotonic() if now is None else now
+        if now < self.next_check:
+            return []
+        self.next_check = now + self.interval
+        self.checks += 1
+        seen = self._scan()
+        changed = sorted(name for name in seen.keys() | self.seen.keys() if seen.get(name) != self.seen.get(name))
+        self.seen = seen
+        return changed
+
+    def _scan(self):
+        # One directory listing; scandir hands back each entry's stat without opening the file
+        seen = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.json') and entry.is_file():
+                        stat = entry.stat()
+                        seen[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return seen
+
+class LevelReloader:
+    """Applies edits of one level file to the World playing it, touching only the entities that changed"""
+
+    def __init__(self, world, filename, compiled=None, cache=level_cache, watcher=None):
+        """compiled is what world was built from; it is read from the cache if not given"""
+        self.world = world
+        self.filename = filename
+        self.cache = cache
+        self.watcher = watcher or LevelWatcher(cache.directory)
+        if compiled is None:
+            compiled = world.streamer.compiled if world.streamer is not None else cache.load(filename)
+        self.compiled = compiled
+        # Platforms of an assembled level never leave it, so they are in record order
+        self.platforms = list(world.platforms) if world.streamer is None else None
+        self.pending = True  # Check once up front, in case the file changed since the level was built
+        self.reloads = 0
+
+    def poll(self):
+        """Apply the level file if it changed; returns a one-line summary, or None if nothing changed"""
+        changed = self.filename in self.watcher.poll()
+        if not (changed or self.pending):
+            return None
+        self.pending = False
+        try:
+            compiled = self.cache.load(self.filename)
+        except FileNotFoundError:
+            return f'{self.filename}: deleted, keeping the loaded level'
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            # Usually a save caught half written; the next save is picked up again
+            return f'{self.filename}: not reloaded ({type(error).__name__}: {error})'
+        return self.apply(compiled)
+
+    def apply(self, compiled):
+        """Bring the world in line with an edited compile of its level; returns a summary, or None if nothing changed"""
+        world = self.world
+        old = self.compiled
+        if (compiled.chunk_count > STREAM_MIN_CHUNKS) != (world.streamer is not None) or compiled.chunk_width != old.chunk_width:
+            return f'{self.filename}: chunk layout changed, restart the level to load it'
+        start = time.perf_counter()
+        (platforms, platform_list), (enemies, enemy_list), (coins, coin_list) = diff_levels(old, compiled)
+        snapshots = [snapshot for snapshot in (world.initial, world.checkpoint) if snapshot is not None]
+
+        if world.streamer is not None:
+            world.streamer.reload(compiled, platforms, enemies, coins)
+            for snapshot in snapshots:
+                snapshot.stream_state = world.streamer.remap_state(snapshot.stream_state, enemies, coins)
+        else:
+            self._apply_platforms(platforms, platform_list)
+            self._apply_group('enemies', enemies, enemy_list, _spawn_enemy, _place_enemy)
+            self._apply_group('coins', coins, coin_list, _spawn_coin, _place_coin)
+
+        if platforms.changed or enemies.changed:
+            if not needs_navigation(compiled.enemy_types):
+                world.nav = None
+            elif world.nav is None or platforms.changed:
+                world.nav = compiled.navigation()
+        if platforms.changed:
+            # The platform a chaser stood on may be gone; it lands again on the next step
+            for enemy in world.enemies:
+                if not enemy.batched:
+                    enemy.unground()
+            for snapshot in snapshots:
+                snapshot.edit_group('enemies', airborne=True)
+        if world.batch is not None:
+            world.batch.invalidate()
+
+        changes = [f'{name} +{len(diff.added)} -{len(diff.removed)} ~{len(diff.moved)}'
+                   for name, diff in (('platforms', platforms), ('enemies', enemies), ('coins', coins)) if diff.changed]
+        changes += self._apply_layout(compiled, snapshots)
+        self.compiled = compiled
+        if not changes:
+            return None
+        self.reloads += 1
+        return f'{self.filename}: {", ".join(changes)} in {(time.perf_counter() - start) * 1000:.1f} ms'
+
+    def _apply_platforms(self, diff, records):
+        if not diff.changed:
+            return
+        world = self.world
+        width = world.static_layer.chunk_width
+        columns = set()
+
+        def touch(rect):
+            columns.update(range(rect.left // width, (rect.right - 1) // width + 1))
+
+        platforms = [None] * len(records)
+        for number, platform in enumerate(self.platforms):
+            new = diff.matches[number]
+            if new is None:
+                world.platforms.remove(platform)
+                touch(platform.rect)
+                continue
+            if number in diff.moved:
+                touch(platform.rect)
+                platform.rect.update(records[new])
+                world.platforms.move(platform)
+                touch(platform.rect)
+            platforms[new] = platform
+        for number in diff.added:
+            platform = platforms[number] = Platform(*records[number])
+            world.platforms.add(platform)
+            touch(platform.rect)
+        self.platforms = platforms
+
+        # Re-bake only the columns an edited platform covers or used to cover
+        rects = {column: [] for column in columns}
+        for platform in platforms:
+            rect = platform.rect
+            for column in range(rect.left // width, (rect.right - 1) // width + 1):
+                if column in rects:
+                    rects[column].append(rect)
+        for column, column_rects in rects.items():
+            if column_rects:
+                world.static_layer.bake_column(column, column_rects)
+            else:
+                world.static_layer.drop_column(column)
+
+    def _apply_group(self, name, diff, records, spawn, place):
+        if not diff.changed:
+            return
+        world = self.world
+        group = getattr(world, name)
+        snapshots = [snapshot for snapshot in (world.initial, world.checkpoint) if snapshot is not None]
+        # Sprites killed since a snapshot come back on restart, so they are renumbered too
+        sprites = {}
+        for sprite in [s for snapshot in snapshots for s in snapshot.members(name)] + list(group):
+            number = getattr(sprite, 'spawn_id', None)
+            if number is not None:
+                sprites[number] = sprite
+        removed = []
+        placed = []
+        for number, sprite in sprites.items():
+            new = diff.matches[number]
+            if new is None:
+                sprite.kill()
+                removed.append(sprite)
+                continue
+            sprite.spawn_id = new
+            if number in diff.moved:
+                place(sprite, records[new])
+                placed.append(sprite)
+        added = []
+        for number in diff.added:
+            sprite = spawn(records[number])
+            sprite.spawn_id = number
+            added.append(sprite)
+        group.add(added)
+        for sprite in placed:
+            if group.has(sprite):
+                group.index.move(sprite)
+        for snapshot in snapshots:
+            snapshot.edit_group(name, removed, placed, added)
+
+    def _apply_layout(self, compiled, snapshots):
+        # Level end, checkpoints and width; returns what changed
+        world = self.world
+        changes = []
+        end = compiled.end_position
+        if end != (tuple(world.level_end.rect.topleft) if world.level_end else None):
+            if end is None:
+                world.level_end = None
+            elif world.level_end is None:
+                world.level_end = LevelEnd(*end)
+            else:
+                world.level_end.rect.topleft = end
+            changes.append('level end')
+        checkpoints = compiled.checkpoints.tolist()
+        if checkpoints != world.checkpoints:
+            # Checkpoints already behind the player count as reached
+            world.checkpoints = checkpoints
+            world.next_checkpoint = bisect_right(checkpoints, world.player.rect.centerx)
+            for snapshot in snapshots:
+                snapshot.edit_checkpoints(checkpoints)
+            changes.append('checkpoints')
+        width = compiled.width or LEVEL_WIDTH
+        if width != world.width:
+            world.width = world.player.level_width = width
+            changes.append('width')
+        return changes
\ No newline at end of file
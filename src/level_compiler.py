@@ -0,0 +1,266 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from .settings import LEVEL_WIDTH, LEVEL_CHUNK_WIDTH
+from .navigation import NavGraph, build_nav_graph
+
+# File layout, all little-endian:
+#   header     magic, version, flags, width, end x/y, chunk width and the record counts below
+#   platforms  int32 x, y, width, height per platform
+#   enemies    int32 x, y, type index per enemy spawn
+#   coins      int32 x, y per coin
+#   checkpoints int32 x per checkpoint
+#   chunks     int32 start/count into each of the three index lists below, per chunk
+#   indexes    int32 platform, enemy and coin numbers listed chunk by chunk
+#   strings    utf-8 level name and enemy type names, NUL separated
+MAGIC = b'SLVL'
+VERSION = 2
+HEADER = struct.Struct('<4sHHiiiiIIIIIIIII')
+FLAG_HAS_END = 1
+FLAG_HAS_WIDTH = 2
+
+CACHE_DIR = '.cache'
+INDEX_FILE = 'index.json'
+
+class CompiledLevel:
+    """Typed-array view of a compiled level, backed by a memory map when read from disk"""
+
+    def __init__(self, buffer, name_default='Level'):
+        view = memoryview(buffer)
+        magic, version = struct.unpack_from('<4sH', view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a compiled level of this version')
+        (_, _, flags, width, end_x, end_y, chunk_width, n_platforms, n_enemies, n_coins, n_checkpoints,
+         n_chunks, n_platform_refs, n_enemy_refs, n_coin_refs, strings_len) = HEADER.unpack_from(view)
+        offset = HEADER.size
+
+        def take(count):
+            nonlocal offset
+            ints = view[offset:offset + count * 4].cast('i')
+            offset += count * 4
+            return ints
+
+        self.platforms = take(n_platforms * 4)
+        self.enemies = take(n_enemies * 3)
+        self.coins = take(n_coins * 2)
+        self.checkpoints = take(n_checkpoints)
+        self.chunk_table = take(n_chunks * 6)
+        self.platform_refs = take(n_platform_refs)
+        self.enemy_refs = take(n_enemy_refs)
+        self.coin_refs = take(n_coin_refs)
+        self.chunk_width = chunk_width
+        self.chunk_count = n_chunks
+        strings = bytes(view[offset:offset + strings_len]).decode('utf-8').split('\0')
+        self.name = strings[0] or name_default
+        self.enemy_types = strings[1:]
+        self.end_position = (end_x, end_y) if flags & FLAG_HAS_END else None
+        self.width = width if flags & FLAG_HAS_WIDTH else None
+        self.nav = None
+        self.nav_cache = None  # (LevelCache, path) keeping this level's NavGraph on disk
+
+    def navigation(self):
+        """The level's NavGraph, read from or written to the cache on first use"""
+        if self.nav is None:
+            if self.nav_cache is not None:
+                cache, path = self.nav_cache
+                self.nav = cache.load_nav(path, self)
+            else:
+                self.nav = build_nav_graph(self.platform_rects())
+        return self.nav
+
+    def chunk_members(self, chunk):
+        """Platform, enemy and coin numbers stored under one chunk"""
+        table = self.chunk_table
+        base = chunk * 6
+        return (
+            self.platform_refs[table[base]:table[base] + table[base + 1]],
+            self.enemy_refs[table[base + 2]:table[base + 2] + table[base + 3]],
+            self.coin_refs[table[base + 4]:table[base + 4] + table[base + 5]]
+        )
+
+    def platform_rects(self):
+        ints = self.platforms
+        return (ints[i:i + 4].tolist() for i in range(0, len(ints), 4))
+
+    def enemy_spawns(self):
+        ints = self.enemies
+        types = self.enemy_types
+        return ((ints[i], ints[i + 1], types[ints[i + 2]]) for i in range(0, len(ints), 3))
+
+    def coin_positions(self):
+        ints = self.coins
+        return ((ints[i], ints[i + 1]) for i in range(0, len(ints), 2))
+
+def compile_level_data(level_data):
+    """Encode parsed level JSON as the compiled binary layout, split into chunks"""
+    enemy_types = []
+    type_index = {}
+    platforms = array('i')
+    for p in level_data.get('platforms', []):
+        platforms.extend((p['x'], p['y'], p['width'], p['height']))
+    enemies = array('i')
+    for e in level_data.get('enemy_spawns', []):
+        if e['type'] not in type_index:
+            type_index[e['type']] = len(enemy_types)
+            enemy_types.append(e['type'])
+        enemies.extend((e['x'], e['y'], type_index[e['type']]))
+    coins = array('i')
+    for c in level_data.get('coins', []):
+        coins.extend((c['x'], c['y']))
+    checkpoints = array('i', sorted(c['x'] for c in level_data.get('checkpoints', [])))
+
+    flags = 0
+    end_x = end_y = 0
+    if 'end_position' in level_data:
+        flags |= FLAG_HAS_END
+        end_x, end_y = level_data['end_position']['x'], level_data['end_position']['y']
+    width = level_data.get('width')
+    if width is not None:
+        flags |= FLAG_HAS_WIDTH
+
+    # Platforms are listed under every chunk they overlap, spawns under the chunk they start in
+    chunk_width = level_data.get('chunk_width', LEVEL_CHUNK_WIDTH)
+    extent = max([width or LEVEL_WIDTH] + [platforms[i] + platforms[i + 2] for i in range(0, len(platforms), 4)])
+    n_chunks = max(1, -(-extent // chunk_width))
+
+    def chunk_of(x):
+        return min(max(x // chunk_width, 0), n_chunks - 1)
+
+    platform_lists = [[] for _ in range(n_chunks)]
+    for number in range(len(platforms) // 4):
+        x, w = platforms[number * 4], platforms[number * 4 + 2]
+        for chunk in range(chunk_of(x), chunk_of(x + max(w, 1) - 1) + 1):
+            platform_lists[chunk].append(number)
+    enemy_lists = [[] for _ in range(n_chunks)]
+    for number in range(len(enemies) // 3):
+        enemy_lists[chunk_of(enemies[number * 3])].append(number)
+    coin_lists = [[] for _ in range(n_chunks)]
+    for number in range(len(coins) // 2):
+        coin_lists[chunk_of(coins[number * 2])].append(number)
+
+    chunk_table = array('i')
+    refs = [array('i'), array('i'), array('i')]
+    for chunk in range(n_chunks):
+        for ref, lists in zip(refs, (platform_lists, enemy_lists, coin_lists)):
+            chunk_table.extend((len(ref), len(lists[chunk])))
+            ref.extend(lists[chunk])
+
+    strings = '\0'.join([level_data.get('name', '')] + enemy_types).encode('utf-8')
+    header = HEADER.pack(
+        MAGIC, VERSION, flags, width or 0, end_x, end_y, chunk_width,
+        len(platforms) // 4, len(enemies) // 3, len(coins) // 2, len(checkpoints),
+        n_chunks, len(refs[0]), len(refs[1]), len(refs[2]), len(strings)
+    )
+    return b''.join([header, platforms.tobytes(), enemies.tobytes(), coins.tobytes(), checkpoints.tobytes(),
+                     chunk_table.tobytes()] + [ref.tobytes() for ref in refs] + [strings])
+
+class LevelCache:
+    """Compiled levels and navigation graphs on disk next to their JSON, revalidated by mtime and content hash"""
+
+    def __init__(self, directory='levels'):
+        self.directory = directory
+        self.cache_dir = os.path.join(directory, CACHE_DIR)
+        self.index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        self._index = None
+        self._lock = threading.Lock()  # The prefetch worker and the main thread share the index
+
+    def load(self, filename, name_default='Level'):
+        """CompiledLevel for a JSON file in the levels directory, compiling it if stale"""
+        with self._lock:
+            return self._load(filename, name_default)
+
+    def _load(self, filename, name_default):
+        source = os.path.join(self.directory, filename)
+        stat = os.stat(source)
+        index = self._read_index()
+        entry = index['files'].get(filename)
+        compiled_path = os.path.join(self.cache_dir, filename[:-len('.json')] + '.bin')
+        nav_path = os.path.join(self.cache_dir, filename[:-len('.json')] + '.nav')
+
+        if not (entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size
+                and entry['version'] == VERSION and os.path.exists(compiled_path)):
+            with open(source, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha1(raw).hexdigest()
+            if not (entry and entry['sha1'] == digest and entry['version'] == VERSION and os.path.exists(compiled_path)):
+                data = compile_level_data(json.loads(raw))
+                try:
+                    self._write_atomic(compiled_path, data)
+                except OSError:
+                    # Read-only install: use the compiled bytes without caching them
+                    return CompiledLevel(data, name_default)
+                # The old graph belongs to the old platforms; the next navigation() rebuilds it
+                try:
+                    os.remove(nav_path)
+                except OSError:
+                    pass
+            index['files'][filename] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': digest, 'version': VERSION}
+            self._write_index()
+
+        with open(compiled_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        compiled = CompiledLevel(mapped, name_default)
+        compiled.nav_cache = (self, nav_path)
+        return compiled
+
+    def load_nav(self, path, compiled):
+        """NavGraph cached at path, rebuilt from compiled's platforms if missing or built with other movement settings"""
+        with self._lock:
+            try:
+                with open(path, 'rb') as f:
+                    return NavGraph.from_bytes(f.read())
+            except (OSError, ValueError):
+                pass
+            nav = build_nav_graph(compiled.platform_rects())
+            try:
+                self._write_atomic(path, nav.to_bytes())
+            except OSError:
+                pass
+            return nav
+
+    def level_numbers(self):
+        """Sorted level numbers in the directory, rescanned only when the directory changes"""
+        with self._lock:
+            return self._level_numbers()
+
+    def _level_numbers(self):
+        index = self._read_index()
+        dir_mtime = os.stat(self.directory).st_mtime_ns
+        if index.get('dir_mtime_ns') != dir_mtime:
+            index['levels'] = sorted(
+                int(f[len('level'):-len('.json')]) for f in os.listdir(self.directory)
+                if f.startswith('level') and f.endswith('.json') and f[len('level'):-len('.json')].isdigit()
+            )
+            index['dir_mtime_ns'] = dir_mtime
+            self._write_index()
+        return index['levels']
+
+    def _read_index(self):
+        if self._index is None:
+            try:
+                with open(self.index_path) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+            self._index.setdefault('files', {})
+        return self._index
+
+    def _write_index(self):
+        try:
+            self._write_atomic(self.index_path, json.dumps(self._index, indent=1).encode('utf-8'))
+        except OSError:
+            pass
+
+    def _write_atomic(self, path, data):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+# Shared cache for the game's levels directory
+level_cache = LevelCache()
@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .settings import PREFETCH_CAPACITY
+from .level_compiler import level_cache
+from .level_manager import load_level, build_compiled_level
+
+def _prepare(level_num):
+    # Runs on the worker: file I/O, decoding, sprite construction and asset warmup
+    try:
+        compiled = level_cache.load(f'level{level_num}.json', f'Level {level_num}')
+    except FileNotFoundError:
+        return None
+    return build_compiled_level(compiled)
+
+class LevelPrefetcher:
+    """Builds upcoming levels on a worker thread; the main thread only converts their surfaces"""
+
+    def __init__(self, capacity=PREFETCH_CAPACITY):
+        self.capacity = capacity
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-prefetch')
+        self._futures = OrderedDict()  # level number -> Future, oldest first
+
+    def prefetch(self, level_num):
+        """Start preparing level_num unless it is already queued or ready"""
+        if level_num in self._futures:
+            self._futures.move_to_end(level_num)
+            return
+        self._futures[level_num] = self._executor.submit(_prepare, level_num)
+        while len(self._futures) > self.capacity:
+            _, stale = self._futures.popitem(last=False)
+            stale.cancel()
+
+    def is_ready(self, level_num):
+        future = self._futures.get(level_num)
+        return future is not None and future.done()
+
+    def take(self, level_num):
+        """Level data for level_num, waiting on its prefetch or loading it now if there was none"""
+        future = self._futures.pop(level_num, None)
+        if future is None or future.cancelled():
+            return load_level(level_num)
+        level_data = future.result()
+        if level_data is None:
+            print(f"Level {level_num} not found!")
+            return None
+        level_data['static_layer'].convert()
+        return level_data
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
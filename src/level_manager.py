@@ -1,69 +1,116 @@
-import json
-import os
 import pygame
 from .settings import *
-from .sprites import Platform, Enemy, Coin, LevelEnd
+from .sprites import Platform, Coin, LevelEnd, make_enemy, needs_navigation
+from .spatial import SpatialGroup, SpatialList
+from .static_layer import StaticLayer
+from .level_compiler import level_cache, compile_level_data, CompiledLevel
+from .streaming import LevelStreamer
+from .navigation import build_nav_graph
 
 def get_max_level():
     """Get the maximum level number from the levels directory"""
-    level_files = [f for f in os.listdir('levels') if f.startswith('level') and f.endswith('.json')]
-    if not level_files:
-        return 0
-    return max(int(f.split('level')[1].split('.')[0]) for f in level_files)
+    numbers = level_cache.level_numbers()
+    return numbers[-1] if numbers else 0
 
 def load_level(level_num):
-    """Load a level from its JSON file"""
+    """Load a level, reading its compiled form and recompiling the JSON only when it changed"""
     try:
-        with open(f'levels/level{level_num}.json', 'r') as f:
-            level_data = json.load(f)
+        compiled = level_cache.load(f'level{level_num}.json', f'Level {level_num}')
     except FileNotFoundError:
         print(f"Level {level_num} not found!")
         return None
+    return build_compiled_level(compiled)
 
-    # Create sprite groups
-    platforms = pygame.sprite.Group()
-    enemies = pygame.sprite.Group()
-    coins = pygame.sprite.Group()
+def build_level(level_data, default_name='Level'):
+    """Create the sprites, collision index and static layer for parsed level JSON"""
+    chunk_width = level_data.get('chunk_width', LEVEL_CHUNK_WIDTH)
+    if -(-level_data.get('width', LEVEL_WIDTH) // chunk_width) > STREAM_MIN_CHUNKS:
+        # Long levels stream their chunks straight from the compiled arrays
+        compiled = CompiledLevel(compile_level_data(level_data), default_name)
+        return build_compiled_level(compiled)
+    end = level_data.get('end_position')
+    platform_rects = [(p['x'], p['y'], p['width'], p['height']) for p in level_data.get('platforms', [])]
+    spawns = level_data.get('enemy_spawns', [])
+    nav = build_nav_graph(platform_rects) if needs_navigation(e['type'] for e in spawns) else None
+    return _assemble(
+        level_data.get('name', default_name),
+        platform_rects,
+        ((e['x'], e['y'], e['type']) for e in spawns),
+        ((c['x'], c['y']) for c in level_data.get('coins', [])),
+        (end['x'], end['y']) if end else None,
+        sorted(checkpoint['x'] for checkpoint in level_data.get('checkpoints', [])),
+        level_data.get('width', LEVEL_WIDTH),
+        chunk_width,
+        nav
+    )
+
+def build_compiled_level(compiled):
+    """Create the same structures as build_level from a CompiledLevel, streaming long levels"""
+    width = compiled.width or LEVEL_WIDTH
+    # Only levels with path-finding enemies build or read a navigation graph
+    nav = compiled.navigation() if needs_navigation(compiled.enemy_types) else None
+    if compiled.chunk_count <= STREAM_MIN_CHUNKS:
+        return _assemble(
+            compiled.name,
+            compiled.platform_rects(),
+            compiled.enemy_spawns(),
+            compiled.coin_positions(),
+            compiled.end_position,
+            compiled.checkpoints.tolist(),
+            width,
+            compiled.chunk_width,
+            nav,
+            compiled
+        )
+    # Only the level end is built now; the World activates chunks around the camera
+    level = _assemble(compiled.name, (), (), (), compiled.end_position, compiled.checkpoints.tolist(),
+                      width, compiled.chunk_width, nav, compiled)
+    level['streamer'] = LevelStreamer(compiled, level['platforms'], level['static_layer'], level['enemies'], level['coins'])
+    return level
+
+def _assemble(name, platform_rects, enemy_spawns, coin_positions, end_position, checkpoints, level_width, chunk_width, nav,
+              compiled=None):
+    # Create sprite groups; collision targets are spatially indexed
+    platforms = SpatialList()
+    enemies = SpatialGroup()
+    coins = SpatialGroup()
     level_end = None
     all_sprites = pygame.sprite.Group()
 
     # Load platforms
-    for platform_data in level_data.get('platforms', []):
-        platform = Platform(
-            platform_data['x'],
-            platform_data['y'],
-            platform_data['width'],
-            platform_data['height']
-        )
-        platforms.add(platform)
-        all_sprites.add(platform)
+    for x, y, width, height in platform_rects:
+        platforms.add(Platform(x, y, width, height))
 
-    # Load enemies
-    if 'enemy_spawns' in level_data:
-        for enemy_data in level_data['enemy_spawns']:
-            enemy = Enemy(enemy_data['x'], enemy_data['y'], enemy_data['type'])
-            enemies.add(enemy)
-            all_sprites.add(enemy)
+    # Load enemies; spawn_id is the record number, which level edits are matched by
+    for number, (x, y, enemy_type) in enumerate(enemy_spawns):
+        enemy = make_enemy(x, y, enemy_type)
+        enemy.spawn_id = number
+        enemies.add(enemy)
+        all_sprites.add(enemy)
 
     # Load coins
-    for coin_data in level_data.get('coins', []):
-        coin = Coin(coin_data['x'], coin_data['y'])
+    for number, (x, y) in enumerate(coin_positions):
+        coin = Coin(x, y)
+        coin.spawn_id = number
         coins.add(coin)
         all_sprites.add(coin)
 
     # Load level end position
-    if 'end_position' in level_data:
-        level_end = LevelEnd(
-            level_data['end_position']['x'],
-            level_data['end_position']['y']
-        )
+    if end_position is not None:
+        level_end = LevelEnd(*end_position)
         all_sprites.add(level_end)
 
     return {
-        'name': level_data.get('name', f'Level {level_num}'),
+        'name': name,
         'platforms': platforms,
+        'static_layer': StaticLayer(platforms, chunk_width),
         'enemies': enemies,
         'coins': coins,
         'level_end': level_end,
+        'checkpoints': checkpoints,
+        'width': level_width,
+        'streamer': None,
+        'nav': nav,
+        'compiled': compiled,  # What the level was built from, for hot reload to diff edits against
         'all_sprites': all_sprites
-    } 
\ No newline at end of file
+    }
@@ -0,0 +1,256 @@
+"""Walkable spans and the jump and fall links between them, for enemies that path-find.
+
+A span is the top of one platform. A link says an enemy can get from one span
+to another by walking, walking off an edge or jumping from a take-off point,
+found by stepping the same gravity the player uses with an enemy's size,
+speed and jump force. Graphs are built once per level and cached next to the
+compiled level; route queries are memoized per destination span.
+"""
+import heapq
+import math
+import struct
+from array import array
+from collections import OrderedDict
+from .settings import JUMP_FORCE, GRAVITY, ENEMY_SPEED, ENEMY_SIZE, SPATIAL_CELL_SIZE, NAV_ROUTE_CACHE
+
+# File layout, all little-endian:
+#   header  magic, version, the physics the links were found with, span and link counts
+#   spans   int32 left, right, top per span, in platform order
+#   links   int32 from span, to span, kind, take-off x, direction, cost per link
+MAGIC = b'SNAV'
+VERSION = 2
+HEADER = struct.Struct('<4sHddiiII')
+
+# Link kinds
+WALK, FALL, JUMP = 0, 1, 2
+
+MAX_AIR_STEPS = 240  # Longest fall considered, in simulation steps
+
+def _pixel(value):
+    # Rounds the way assigning to a pygame Rect does: half away from zero
+    return math.floor(value + 0.5) if value >= 0 else -math.floor(0.5 - value)
+
+def _trajectory(velocity):
+    """How far below its start an airborne agent's top is after each step, with its vertical speed"""
+    path = []
+    top = 0
+    for _ in range(MAX_AIR_STEPS):
+        velocity += GRAVITY
+        top = _pixel(top + velocity)
+        path.append((top, velocity))
+    return path
+
+def _landing_step(path, drop):
+    """Step at which an agent on path lands on a surface drop pixels below its start, or None"""
+    previous = 0
+    for step, (top, velocity) in enumerate(path, 1):
+        if velocity > 0 and top > drop:
+            # Platforms stop a falling agent only if its feet were on or above them a step earlier
+            return step if previous <= drop else None
+        previous = top
+    return None
+
+def _clear(path, steps, left, start_top, direction, speed, size, blockers):
+    """Whether the flight up to the landing step touches none of blockers"""
+    for top, _ in path[:steps - 1]:
+        left += speed * direction
+        top += start_top
+        for b_left, b_right, b_top, b_bottom in blockers:
+            if left < b_right and b_left < left + size and top < b_bottom and b_top < top + size:
+                return False
+    return True
+
+class NavGraph:
+    """Spans and links of one level, with memoized next-link route queries"""
+
+    def __init__(self, spans, links, cell_size=SPATIAL_CELL_SIZE, route_cache=NAV_ROUTE_CACHE):
+        self.spans = spans  # int array, 3 per span
+        self.links = links  # int array, 6 per link
+        self.cell_size = cell_size
+        self.route_cache = route_cache
+        self._routes = OrderedDict()  # goal span -> first link index per start span, least recently used first
+        self._located = (None, None)
+        self.route_hits = 0
+        self.route_misses = 0
+        count = len(spans) // 3
+        self._incoming = [[] for _ in range(count)]
+        for link in range(len(links) // 6):
+            self._incoming[links[link * 6 + 1]].append(link)
+        # Span numbers per grid column, highest surface first
+        self._columns = {}
+        for number in range(count):
+            left, right = spans[number * 3], spans[number * 3 + 1]
+            for column in range(left // cell_size, (right - 1) // cell_size + 1):
+                self._columns.setdefault(column, []).append(number)
+        for column in self._columns.values():
+            column.sort(key=lambda number: spans[number * 3 + 2])
+
+    def __len__(self):
+        return len(self.spans) // 3
+
+    def span(self, number):
+        """(left, right, top) of a span"""
+        base = number * 3
+        return self.spans[base], self.spans[base + 1], self.spans[base + 2]
+
+    def link(self, number):
+        """(from span, to span, kind, take-off x, direction, cost) of a link"""
+        base = number * 6
+        return tuple(self.links[base:base + 6])
+
+    def span_under(self, x, bottom):
+        """Highest span at x whose surface is at or below bottom, or None"""
+        if self._located[0] == (x, bottom):
+            return self._located[1]
+        found = None
+        spans = self.spans
+        for number in self._columns.get(x // self.cell_size, ()):
+            base = number * 3
+            if spans[base + 2] >= bottom and spans[base] <= x < spans[base + 1]:
+                found = number
+                break
+        # Every chaser looks up the same target each step, so the last answer is kept
+        self._located = ((x, bottom), found)
+        return found
+
+    def next_link(self, start, goal):
+        """Link to take from span start toward span goal, or None when goal is start or out of reach"""
+        if start == goal or start is None or goal is None:
+            return None
+        routes = self._routes.get(goal)
+        if routes is None:
+            self.route_misses += 1
+            routes = self._routes[goal] = self._route_to(goal)
+            if len(self._routes) > self.route_cache:
+                self._routes.popitem(last=False)
+        else:
+            self.route_hits += 1
+            self._routes.move_to_end(goal)
+        link = routes[start]
+        return None if link < 0 else link
+
+    def _route_to(self, goal):
+        # Dijkstra backwards from goal gives every span's first hop in one search
+        cost = [None] * len(self)
+        first = array('i', [-1]) * len(self)
+        cost[goal] = 0
+        queue = [(0, goal)]
+        links = self.links
+        while queue:
+            total, span = heapq.heappop(queue)
+            if total > cost[span]:
+                continue
+            for link in self._incoming[span]:
+                source = links[link * 6]
+                candidate = total + links[link * 6 + 5]
+                if cost[source] is None or candidate < cost[source]:
+                    cost[source] = candidate
+                    first[source] = link
+                    heapq.heappush(queue, (candidate, source))
+        return first
+
+    def stats(self):
+        return {'spans': len(self), 'links': len(self.links) // 6, 'cached_routes': len(self._routes),
+                'route_hits': self.route_hits, 'route_misses': self.route_misses}
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, VERSION, JUMP_FORCE, GRAVITY, ENEMY_SPEED, ENEMY_SIZE,
+                             len(self.spans) // 3, len(self.links) // 6)
+        return header + self.spans.tobytes() + self.links.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Graph read back from to_bytes(); ValueError when stale or built with other physics"""
+        if len(data) < HEADER.size:
+            raise ValueError('truncated navigation graph')
+        magic, version, jump, gravity, speed, size, n_spans, n_links = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a navigation graph of this version')
+        if (jump, gravity, speed, size) != (JUMP_FORCE, GRAVITY, ENEMY_SPEED, ENEMY_SIZE):
+            raise ValueError('navigation graph was built with other movement settings')
+        if len(data) != HEADER.size + (n_spans * 3 + n_links * 6) * 4:
+            raise ValueError('truncated navigation graph')
+        spans = array('i')
+        spans.frombytes(data[HEADER.size:HEADER.size + n_spans * 12])
+        links = array('i')
+        links.frombytes(data[HEADER.size + n_spans * 12:])
+        return cls(spans, links)
+
+def build_nav_graph(platform_rects, size=ENEMY_SIZE, speed=ENEMY_SPEED, jump_force=JUMP_FORCE):
+    """NavGraph for an enemy of the given size, speed and jump over (x, y, width, height) platforms"""
+    rects = [tuple(rect) for rect in platform_rects]
+    spans = array('i')
+    for x, y, width, height in rects:
+        spans.extend((x, x + width, y))
+    blockers = [(x, x + width, y, y + height) for x, y, width, height in rects]
+    # Vertical motion does not depend on x, so each arc is stepped once for every pair
+    jump_path = _trajectory(jump_force)
+    fall_path = _trajectory(0)
+    rise = -min(top for top, _ in jump_path)
+    reach = speed * MAX_AIR_STEPS + size
+
+    # Platforms per grid column, to find the ones near a pair without scanning them all
+    cell = SPATIAL_CELL_SIZE
+    columns = {}
+    for number, (x, _, width, _) in enumerate(rects):
+        for column in range(x // cell, (x + max(width, 1) - 1) // cell + 1):
+            columns.setdefault(column, []).append(number)
+
+    def near(lo, hi, skip):
+        found = set()
+        for column in range(lo // cell, (hi - 1) // cell + 1):
+            found.update(columns.get(column, ()))
+        found.discard(skip)
+        return [blockers[number] for number in sorted(found)]
+
+    links = array('i')
+    for a, (a_left, a_right, a_top, _) in enumerate(blockers):
+        if a_right <= a_left:
+            continue
+        start_top = a_top - size
+        # Agent left edges that still stand on a
+        low, high = a_left - size + 1, a_right - 1
+        for b in sorted(set(number for column in range((a_left - reach) // cell, (a_right + reach - 1) // cell + 1)
+                            for number in columns.get(column, ()))):
+            b_left, b_right, b_top, _ = blockers[b]
+            drop = b_top - a_top
+            if a == b or b_right <= b_left or drop < -rise:
+                continue
+            # Where to land on b: its near edge, or centered when it is narrower than the agent
+            centered = (b_left + b_right - size) // 2
+            for direction in (1, -1):
+                if drop == 0 and (b_left == a_right if direction > 0 else b_right == a_left):
+                    # Touching surfaces at the same height are walked across
+                    links.extend((a, b, WALK, a_right if direction > 0 else a_left - size, direction, 1))
+                    continue
+                if drop > 0:
+                    # Walk off the edge and drop
+                    edge = a_right if direction > 0 else a_left - size
+                    steps = _landing_step(fall_path, drop)
+                    if steps is not None:
+                        land = edge + direction * speed * steps
+                        if (b_left - size < land < b_right
+                                and _clear(fall_path, steps, edge, start_top, direction, speed, size,
+                                           near(min(edge, land), max(edge, land) + size, a))):
+                            links.extend((a, b, FALL, edge, direction, steps * speed + drop // 4))
+                            continue
+                # Jump from the take-off point on a nearest to landing at b's near edge
+                steps = _landing_step(jump_path, drop)
+                if steps is None:
+                    continue
+                travel = direction * speed * steps
+                if b_right - b_left < size:
+                    target = centered
+                else:
+                    target = b_left if direction > 0 else b_right - size
+                # Backing off from there gives room to rise past b's underside before reaching it
+                for backoff in range(0, size + abs(travel) + 1, size // 4):
+                    takeoff = min(max(target - travel - direction * backoff, low), high)
+                    land = takeoff + travel
+                    if not b_left - size < land < b_right:
+                        break
+                    if _clear(jump_path, steps, takeoff, start_top, direction, speed, size,
+                              near(min(takeoff, land), max(takeoff, land) + size, a)):
+                        links.extend((a, b, JUMP, takeoff, direction, steps * speed + size))
+                        break
+    return NavGraph(spans, links)
\ No newline at end of file
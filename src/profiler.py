@@ -0,0 +1,178 @@
+import json
+import sys
+import time
+from collections import deque
+import pygame
+from .settings import WHITE, BLACK, PROFILER_WINDOW, TRACE_CAPTURE_FRAMES
+
+class _NullScope:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SCOPE = _NullScope()
+
+class _Scope:
+    __slots__ = ('profiler', 'name', 'start', 'blocks')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.profiler._record(self.name, self.start, end, sys.getallocatedblocks() - self.blocks)
+        return False
+
+class Profiler:
+    """Per-phase frame timings with a rolling on-screen overlay and Chrome trace capture"""
+
+    def __init__(self, window=PROFILER_WINDOW):
+        self.window = window
+        self.enabled = False
+        self.show_overlay = False
+        self.timings = {}  # phase -> rolling seconds per frame
+        self.blocks = {}  # phase -> rolling net allocated blocks per frame
+        self._frame_timings = {}
+        self._frame_blocks = {}
+        self._trace = None
+        self._trace_frames = 0
+        self._trace_path = None
+        self._font = None
+
+    def scope(self, name):
+        """Context manager timing one phase; a shared no-op when the profiler is off"""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.enabled = self.show_overlay or self._trace is not None
+        self._frame_timings.clear()
+        self._frame_blocks.clear()
+
+    def capture(self, path, frames=TRACE_CAPTURE_FRAMES):
+        """Record the next frames as Chrome trace_event JSON written to path"""
+        self._trace = []
+        self._trace_frames = frames
+        self._trace_path = path
+        self.enabled = True
+
+    def end_frame(self):
+        """Fold this frame's scopes into the rolling window and finish any capture"""
+        if not self.enabled:
+            return
+        for name, seconds in self._frame_timings.items():
+            if name not in self.timings:
+                self.timings[name] = deque(maxlen=self.window)
+                self.blocks[name] = deque(maxlen=self.window)
+            self.timings[name].append(seconds)
+            self.blocks[name].append(self._frame_blocks[name])
+        self._frame_timings.clear()
+        self._frame_blocks.clear()
+
+        if self._trace is not None:
+            self._trace_frames -= 1
+            if self._trace_frames <= 0:
+                self._write_trace()
+
+    def _record(self, name, start, end, blocks):
+        self._frame_timings[name] = self._frame_timings.get(name, 0.0) + end - start
+        self._frame_blocks[name] = self._frame_blocks.get(name, 0) + blocks
+        if self._trace is not None:
+            self._trace.append({
+                'name': name,
+                'ph': 'X',
+                'ts': start * 1e6,
+                'dur': (end - start) * 1e6,
+                'pid': 0,
+                'tid': 0,
+                'args': {'blocks': blocks}
+            })
+
+    def _write_trace(self):
+        with open(self._trace_path, 'w') as f:
+            json.dump({'traceEvents': self._trace, 'displayTimeUnit': 'ms'}, f)
+        print(f'Wrote trace to {self._trace_path}')
+        self._trace = None
+        self.enabled = self.show_overlay
+
+    def summary(self):
+        """phase -> (average ms, max ms, average net allocated blocks) over the window"""
+        result = {}
+        for name, samples in self.timings.items():
+            blocks = self.blocks[name]
+            result[name] = (
+                sum(samples) / len(samples) * 1000,
+                max(samples) * 1000,
+                sum(blocks) / len(blocks)
+            )
+        return result
+
+    def draw(self, surface):
+        if not self.show_overlay:
+            return
+        if self._font is None:
+            self._font = pygame.font.SysFont('monospace', 15)
+        lines = [f"{'phase':<20}{'avg ms':>8}{'max ms':>8}{'blocks':>8}"]
+        for name, (avg, peak, blocks) in sorted(self.summary().items()):
+            lines.append(f'{name:<20}{avg:>8.2f}{peak:>8.2f}{blocks:>8.0f}')
+        height = 18 * len(lines) + 8
+        panel = pygame.Surface((360, height))
+        panel.set_alpha(180)
+        panel.fill(BLACK)
+        surface.blit(panel, (10, 80))
+        for i, line in enumerate(lines):
+            surface.blit(self._font.render(line, True, WHITE), (16, 84 + i * 18))
+
+class CpuMeter:
+    """Process CPU time as a share of wall time, summed over the intervals it was running"""
+
+    def __init__(self):
+        self.cpu = 0.0
+        self.wall = 0.0
+        self._start = None
+
+    def start(self):
+        if self._start is None:
+            self._start = (time.process_time(), time.perf_counter())
+
+    def stop(self):
+        if self._start is not None:
+            cpu, wall = self._start
+            self.cpu += time.process_time() - cpu
+            self.wall += time.perf_counter() - wall
+            self._start = None
+
+    def usage(self):
+        return self.cpu / self.wall if self.wall else 0.0
+
+class StartupTimer:
+    """Named milestones from launch to the first presented frame"""
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+    def report(self):
+        """One line with the time each milestone took and the total"""
+        parts = []
+        last = self.start
+        for name, when in self.marks:
+            parts.append(f'{name} {(when - last) * 1000:.0f} ms')
+            last = when
+        return f"Startup: {', '.join(parts)}; {(last - self.start) * 1000:.0f} ms total"
+
+# Shared profiler used by the game loop and the world
+profiler = Profiler()
@@ -0,0 +1,77 @@
+import pygame
+from .settings import (
+    RENDER_SCALE, RENDER_SCALE_AUTO, RENDER_SCALES, RENDER_BUDGET, RENDER_RAISE_FRACTION, RENDER_ADAPT_FRAMES,
+    RENDER_MIN_GAIN
+)
+
+class RenderTarget:
+    """Surface the world is drawn into: the window itself, or a smaller one upscaled onto it once per frame
+
+    Everything outside the world (HUD, menus, mouse input) keeps using the
+    window and its coordinates. In auto mode the scale follows the average
+    frame work time, stepping through scales one at a time. The upscale costs
+    about a full-window blit, so where drawing is cheap a lower scale can cost
+    as much as it saves; auto mode goes back from such a scale and skips it.
+    """
+
+    def __init__(self, window, scale=RENDER_SCALE, auto=RENDER_SCALE_AUTO, scales=RENDER_SCALES,
+                 budget=RENDER_BUDGET):
+        self.window = window
+        self.scales = sorted(set(scales) | {scale}, reverse=True)
+        self.auto = auto
+        self.budget = budget
+        self.surface = window
+        self.scale = 1
+        self.changes = 0
+        self.rejected = set()  # Lower scales that did not cut the work by enough to pay for the upscale
+        self._lowered_from = None  # (scale, average work) before the last step down, until it is judged
+        self._work = []
+        self.set_scale(scale)
+
+    def set_scale(self, scale):
+        if scale == self.scale:
+            return
+        self.scale = scale
+        if scale == 1:
+            self.surface = self.window
+        else:
+            width, height = self.window.get_size()
+            # Same pixel format as the window, so the upscale writes straight into it
+            self.surface = pygame.Surface((round(width * scale), round(height * scale)), 0, self.window)
+        self._work.clear()
+
+    def present(self):
+        """Upscale the world frame onto the window; nothing to do at full scale"""
+        if self.surface is not self.window:
+            pygame.transform.scale(self.surface, self.window.get_size(), self.window)
+
+    def adapt(self, work_seconds):
+        """Record one frame's work time; in auto mode, returns whether the scale just changed"""
+        if not self.auto:
+            return False
+        self._work.append(work_seconds)
+        if len(self._work) < RENDER_ADAPT_FRAMES:
+            return False
+        average = sum(self._work) / len(self._work)
+        self._work.clear()
+        if self._lowered_from is not None:
+            above, above_average = self._lowered_from
+            self._lowered_from = None
+            if average > above_average * RENDER_MIN_GAIN:
+                # Drawing less did not make up for the upscale; go back and stop trying this scale
+                self.rejected.add(self.scale)
+                return self._change(above)
+        index = self.scales.index(self.scale)
+        lower = [scale for scale in self.scales[index + 1:] if scale not in self.rejected]
+        if average > self.budget and lower:
+            self._lowered_from = (self.scale, average)
+            return self._change(lower[0])
+        higher = [scale for scale in self.scales[:index] if scale not in self.rejected]
+        if average < self.budget * RENDER_RAISE_FRACTION and higher:
+            return self._change(higher[-1])
+        return False
+
+    def _change(self, scale):
+        self.set_scale(scale)
+        self.changes += 1
+        return True
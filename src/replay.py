@@ -0,0 +1,128 @@
+"""Record the inputs the world sees and replay them headlessly.
+
+    python main.py --record run.json
+    python -m src.replay run.json
+
+A log holds one segment per level played: the level number, one byte of input
+per fixed step and the state hash the level ended with. Replaying feeds the
+same bytes back as fast as possible, reports step timings and fails if any
+segment ends in a different state.
+"""
+import argparse
+import base64
+import json
+import random
+import sys
+import time
+import zlib
+from .settings import BATCHED_ENTITIES, SIMULATION_RATE, PHYSICS_RATE
+from .simulation import World, InputState, init_headless
+
+VERSION = 1
+
+# One byte per step: the four inputs, plus a flag for a restart before the step
+LEFT, RIGHT, JUMP, SHOOT = 1, 2, 4, 8
+RESTART = 128
+
+def encode_inputs(inputs):
+    return (LEFT * bool(inputs.left) | RIGHT * bool(inputs.right)
+            | JUMP * bool(inputs.jump) | SHOOT * bool(inputs.shoot))
+
+def decode_inputs(byte):
+    return InputState(bool(byte & LEFT), bool(byte & RIGHT), bool(byte & JUMP), bool(byte & SHOOT))
+
+def segment_seed(seed, index):
+    """RNG seed applied when segment index starts, in recording and replay alike"""
+    return seed * 1000003 + index
+
+class InputRecorder:
+    """Collects the per-step input of each level into a replayable log"""
+
+    def __init__(self, seed=None):
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.segments = []
+        self._steps = None
+        self._restart = False
+
+    def begin_level(self, level):
+        """Start a segment; call before building the level's World"""
+        random.seed(segment_seed(self.seed, len(self.segments)))
+        self.segments.append({'level': level, 'hash': None})
+        self._steps = bytearray()
+        self._restart = False
+
+    def record(self, inputs):
+        self._steps.append(encode_inputs(inputs) | (RESTART if self._restart else 0))
+        self._restart = False
+
+    def restart(self):
+        """Note that the world was rewound before the next step"""
+        self._restart = True
+
+    def end_level(self, world):
+        """Close the open segment with the state the world reached"""
+        if self._steps is None:
+            return
+        segment = self.segments[-1]
+        segment['steps'] = len(self._steps)
+        segment['hash'] = world.state_hash()
+        segment['inputs'] = base64.b64encode(zlib.compress(bytes(self._steps), 9)).decode('ascii')
+        self._steps = None
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'version': VERSION, 'seed': self.seed, 'rate': SIMULATION_RATE, 'segments': self.segments}, f)
+
+def load_log(path):
+    with open(path) as f:
+        log = json.load(f)
+    if log.get('version') != VERSION:
+        raise ValueError(f'{path} is not a version {VERSION} input log')
+    for segment in log['segments']:
+        segment['inputs'] = zlib.decompress(base64.b64decode(segment['inputs']))
+    return log
+
+def replay_segment(log, index, batched=BATCHED_ENTITIES):
+    """Step one segment's level through its inputs; returns (state hash, seconds per step)"""
+    from .level_manager import load_level
+
+    segment = log['segments'][index]
+    random.seed(segment_seed(log['seed'], index))
+    # Steps only replay identically at the rate they were recorded at; older logs have no rate and ran at 60 Hz
+    world = World(load_level(segment['level']), batched=batched, rate=log.get('rate', PHYSICS_RATE))
+    timings = []
+    clock = time.perf_counter
+    for byte in segment['inputs']:
+        if byte & RESTART:
+            world.restart()
+        start = clock()
+        world.step(decode_inputs(byte))
+        timings.append(clock() - start)
+    return world.state_hash(), timings
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded input log headlessly')
+    parser.add_argument('log')
+    parser.add_argument('--repeat', type=int, default=1, help='replay each segment this many times')
+    parser.add_argument('--batched', action='store_true', help='use the NumPy entity backend')
+    args = parser.parse_args()
+
+    init_headless()
+    log = load_log(args.log)
+    mismatches = 0
+    print(f"{'segment':>7} {'level':>5} {'steps':>7} {'steps/s':>9} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'at step':>7}  state")
+    for index, segment in enumerate(log['segments']):
+        for _ in range(args.repeat):
+            digest, timings = replay_segment(log, index, args.batched or BATCHED_ENTITIES)
+            ordered = sorted(timings) or [0.0]
+            slowest = max(range(len(timings)), key=timings.__getitem__) if timings else 0
+            matches = digest == segment['hash']
+            mismatches += not matches
+            state = 'ok' if matches else 'MISMATCH'
+            print(f"{index:>7} {segment['level']:>5} {len(timings):>7} {len(timings) / max(sum(timings), 1e-9):>9.0f} "
+                  f"{ordered[len(ordered) // 2] * 1000:>7.3f} {ordered[len(ordered) * 99 // 100] * 1000:>7.3f} "
+                  f"{ordered[-1] * 1000:>7.3f} {slowest:>7}  {state}")
+    return 1 if mismatches else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
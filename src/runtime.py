@@ -0,0 +1,19 @@
+import pygame
+from .settings import FONT_SIZE, MIXER_FREQUENCY, MIXER_BUFFER
+
+_font = None
+
+def init():
+    """Initialize pygame's subsystems unless that already happened"""
+    if not pygame.get_init():
+        pygame.mixer.pre_init(MIXER_FREQUENCY, -16, 2, MIXER_BUFFER)
+        pygame.init()
+
+def get_font():
+    """The shared HUD and menu font, created on first use"""
+    global _font
+    if _font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        _font = pygame.font.Font(None, FONT_SIZE)
+    return _font
\ No newline at end of file
@@ -1,14 +1,49 @@
-import pygame
-
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()
+# Plain configuration constants; pygame and every runtime resource are initialized
+# lazily by the modules that use them, so importing this stays cheap
 
 # Window settings
 WINDOW_WIDTH = 1280
 WINDOW_HEIGHT = 720
 FPS = 60
 
+# Internal render resolution for the world, as a fraction of the window; 0.5 draws it at 640x360
+# and upscales once per frame. HUD, menus and input stay in window coordinates.
+RENDER_SCALE = 1.0
+RENDER_SCALE_AUTO = False  # Step the scale down while frames run over budget, and back up with headroom
+RENDER_SCALES = (1.0, 0.5)  # Scales auto mode steps through; whole-number upscales are much cheaper than 0.75
+RENDER_BUDGET = 1.0 / FPS  # Frame work time, excluding the wait for the next frame, auto mode aims for
+RENDER_RAISE_FRACTION = 0.5  # Share of the budget frames must stay under before auto mode raises the scale
+RENDER_ADAPT_FRAMES = 60  # Frames averaged before each auto mode decision
+RENDER_MIN_GAIN = 0.85  # Share of the work at the scale above a lower scale must stay under, or auto mode drops it
+
+# Level layout; a level file may override its width and chunk width
+LEVEL_WIDTH = WINDOW_WIDTH * 3
+LEVEL_CHUNK_WIDTH = WINDOW_WIDTH
+STREAM_MIN_CHUNKS = 8  # Levels with more chunks than this are streamed
+STREAM_MARGIN_CHUNKS = 1  # Chunks kept active beyond each edge of the camera
+STREAM_CACHE_CHUNKS = 16  # Decoded chunks kept in memory after deactivation
+
+# Level hot reload for play-testing; --hot-reload turns it on
+HOT_RELOAD = False
+HOT_RELOAD_INTERVAL = 0.5  # Seconds between looks at the level files' modification times
+
+# Simulation settings
+SIMULATION_RATE = 60  # Fixed world steps per second, independent of FPS
+SIMULATION_STEP = 1.0 / SIMULATION_RATE
+PHYSICS_RATE = 60  # Step rate the speeds, forces and timers below are tuned for; other rates scale them
+MAX_FRAME_TIME = 0.25  # Longest stall the simulation will try to catch up on
+
+# Menus and overlays block on input instead of redrawing every frame
+IDLE_WAIT_MS = 250  # Longest an idle screen sleeps waiting for an event
+
+# Level prefetch settings
+PREFETCH_CAPACITY = 2  # Prepared levels kept waiting at most
+PREFETCH_PROGRESS = 0.6  # Fraction of the way to the flag where the next level starts loading
+
+# Profiler settings
+PROFILER_WINDOW = 120  # Frames averaged by the overlay
+TRACE_CAPTURE_FRAMES = 300  # Frames written per Chrome trace capture
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -19,6 +54,7 @@ PINK = (255, 192, 203)
 YELLOW = (255, 255, 0)
 GOLD = (255, 215, 0)
 MENU_BLUE = (0, 100, 255)
+STATIC_COLORKEY = (255, 0, 255)  # Transparent color of baked level chunks
 
 # Player properties
 PLAYER_WIDTH = 80
@@ -28,18 +64,62 @@ JUMP_FORCE = -15
 DOUBLE_JUMP_FORCE = -12
 GRAVITY = 0.8
 MAX_LIVES = 3
+PLAYER_START = (100, 500)
+
+# Animation properties
+ANIMATION_FRAME_TICKS = 6  # Updates each animation frame stays on screen
 
 # Projectile properties
 PROJECTILE_SPEED = 10
 PROJECTILE_SIZE = 10
+PROJECTILE_POOL_SIZE = 128  # Projectiles in flight at once; further shots are dropped
+PROJECTILE_CULL_MARGIN = 64  # Distance past the camera view where projectiles expire
 
 # Enemy properties
 ENEMY_SPEED = 2
 ENEMY_SIZE = 80
+NAV_ROUTE_CACHE = 256  # Destination spans whose routes chasing enemies keep memoized
 
 # Coin properties
 COIN_SIZE = 30
 
+# Collision broad-phase grid cell size in pixels
+SPATIAL_CELL_SIZE = 128
+SPATIAL_MIN_ITEMS = 128  # Collision indexes smaller than this scan every rect instead of using the grid
+
+# Update enemies and projectiles with the NumPy backend (needs numpy installed)
+BATCHED_ENTITIES = False
+
+# Background layers, back to front: (image, tile size, scroll speed relative to the camera)
+BACKGROUND_LAYERS = [
+    ('images/background.png', (WINDOW_WIDTH * 3, WINDOW_HEIGHT), 0.5)
+]
+
+# Rendered HUD and menu strings kept for reuse
+TEXT_CACHE_SIZE = 128
+STATUS_MESSAGE_MS = 3000  # How long a status line such as a hot reload summary stays on the HUD
+
+# Mixer settings; a smaller buffer lowers latency at the cost of more frequent audio callbacks
+MIXER_FREQUENCY = 44100
+MIXER_BUFFER = 512
+BACKGROUND_MUSIC = 'sounds/background.wav'
+
+# Channels reserved for each group of sound effects
+SOUND_GROUPS = {
+    'player': 3,
+    'pickup': 3,
+    'combat': 2
+}
+
+# Sound effect for each simulation event: (file, channel group, voice limit, priority)
+SOUND_EFFECTS = {
+    'coin': ('sounds/coin.wav', 'pickup', 3, 1),
+    'jump': ('sounds/jump.wav', 'player', 1, 2),
+    'shoot': ('sounds/shoot.wav', 'player', 2, 1),
+    'hurt': ('sounds/hit.wav', 'player', 1, 3),
+    'hit': ('sounds/hit.wav', 'combat', 2, 2)
+}
+
 # Game states
 MENU = 0
 PLAYING = 1
@@ -47,9 +127,5 @@ PAUSED = 2
 GAME_OVER = 3
 LEVEL_COMPLETE = 4
 
-# Initialize font
-FONT = pygame.font.Font(None, 36)
-
-# Load background image
-background_image = pygame.image.load('images/background.png')
-background_image = pygame.transform.scale(background_image, (WINDOW_WIDTH * 3, WINDOW_HEIGHT)) 
\ No newline at end of file
+# HUD and menu font; the font object itself is created on first use
+FONT_SIZE = 36
\ No newline at end of file
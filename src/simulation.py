@@ -0,0 +1,258 @@
+import argparse
+import hashlib
+import os
+import time
+from collections import namedtuple
+import pygame
+from .settings import (
+    WINDOW_WIDTH, SIMULATION_RATE, SIMULATION_STEP, PHYSICS_RATE, MAX_FRAME_TIME, PLAYER_START,
+    BATCHED_ENTITIES, PROJECTILE_CULL_MARGIN, PLAYER_SPEED, ENEMY_SPEED, GRAVITY
+)
+from .collision import swept_x
+from .sprites import Player, ProjectilePool
+from .batch import EntityBatch
+from .profiler import profiler
+from .snapshot import LevelSnapshot
+
+# Everything the world needs from the keyboard for one step
+InputState = namedtuple('InputState', ['left', 'right', 'jump', 'shoot'], defaults=[False, False, False, False])
+NO_INPUT = InputState()
+
+class World:
+    """Level state advanced in fixed steps from explicit input, with no rendering or I/O"""
+
+    def __init__(self, level_data, player=None, batched=BATCHED_ENTITIES, rate=SIMULATION_RATE):
+        """Wrap freshly built level_data, reusing player from a previous level if given
+
+        rate is steps per second and must divide PHYSICS_RATE; each step covers
+        PHYSICS_RATE / rate base steps and plays out exactly as they would.
+        """
+        if rate <= 0 or PHYSICS_RATE % rate:
+            raise ValueError(f'simulation rate {rate} does not divide {PHYSICS_RATE}')
+        self.rate = rate
+        self.dt = PHYSICS_RATE // rate
+        self.name = level_data['name']
+        self.platforms = level_data['platforms']
+        self.static_layer = level_data['static_layer']
+        self.enemies = level_data['enemies']
+        self.coins = level_data['coins']
+        self.level_end = level_data['level_end']
+        if player is None:
+            player = Player(*PLAYER_START)
+        else:
+            player.reset(*PLAYER_START)
+        self.player = player
+        self.width = level_data['width']
+        player.level_width = self.width
+        self.streamer = level_data['streamer']
+        self.nav = level_data['nav']
+        if self.streamer is not None:
+            self.streamer.update(player.camera_x)
+        self.projectiles = pygame.sprite.Group()
+        self.projectile_pool = ProjectilePool()
+        # Optional NumPy backend that updates enemies and projectiles in bulk
+        self.batch = EntityBatch(self.enemies, self.projectiles, self.platforms) if batched else None
+        self.frame = 0
+        self.prev_camera_x = self.player.camera_x
+        self.prev_player_pos = self.player.rect.topleft
+        self.checkpoints = level_data.get('checkpoints', [])
+        self.next_checkpoint = 0
+        self.initial = LevelSnapshot(self)
+        self.checkpoint = None
+
+    def step(self, inputs=NO_INPUT):
+        """Advance one fixed step and return the events it produced"""
+        player = self.player
+        self.prev_camera_x = player.camera_x
+        self.prev_player_pos = player.rect.topleft
+        if inputs.jump:
+            player.jump()
+        if inputs.shoot:
+            projectile = player.shoot(self.projectile_pool)
+            if projectile is not None:
+                self.projectiles.add(projectile)
+                player.events.append('shoot')
+
+        if self.dt > 1 and self.needs_base_steps():
+            # Play the step out at the base rate, stopping where the base rate would
+            events = []
+            for _ in range(self.dt):
+                events += self.advance(inputs, 1)
+                if 'level_complete' in events or 'game_over' in events:
+                    break
+        else:
+            events = self.advance(inputs, self.dt)
+        self.frame += 1
+        return events
+
+    def needs_base_steps(self):
+        """Whether something could meet something else partway through a long step
+
+        The player and enemies already move in base steps on their own; what a
+        long step cannot do is interleave them with each other, with projectiles,
+        chunk streaming and checkpoints, so any of those in reach rules it out.
+        """
+        player = self.player
+        dt = self.dt
+        if any(enemy.navigates for enemy in self.enemies):
+            # Chasers steer by where the player is at every base step
+            return True
+        reach_x = (PLAYER_SPEED + ENEMY_SPEED) * dt
+        reach_y = abs(player.velocity_y) * dt + GRAVITY * dt * dt
+        reach = player.rect.inflate(2 * reach_x, 2 * reach_y)
+        if self.enemies.colliding(reach) or (self.level_end and reach.colliderect(self.level_end.rect)):
+            return True
+        if self.next_checkpoint < len(self.checkpoints) and \
+                player.rect.centerx + PLAYER_SPEED * dt >= self.checkpoints[self.next_checkpoint]:
+            return True
+        if self.streamer is not None:
+            window = self.streamer.window(player.camera_x)
+            if any(self.streamer.window(player.camera_x + offset) != window
+                   for offset in (-PLAYER_SPEED * dt, PLAYER_SPEED * dt)):
+                return True
+        for projectile in self.projectiles:
+            flown = swept_x(projectile.rect.move(projectile.speed * projectile.direction * dt, 0),
+                            projectile.speed * projectile.direction * dt)
+            if self.enemies.colliding(flown.inflate(2 * ENEMY_SPEED * dt, 0)):
+                return True
+        return False
+
+    def advance(self, inputs, dt):
+        """Move everything dt base steps on held keys and return the events that produced"""
+        player = self.player
+        if self.streamer is not None:
+            with profiler.scope('streaming'):
+                self.streamer.update(player.camera_x)
+
+        with profiler.scope('player.update'):
+            player.update(self.platforms, self.projectiles, self.enemies, self.coins, self.level_end, inputs, dt)
+        with profiler.scope('enemies.update'):
+            if self.batch is not None:
+                self.batch.update_enemies(dt)
+                # Chasers path-find one at a time outside the arrays
+                for enemy in self.batch.navigators:
+                    enemy.update(self.platforms, self.nav, player, dt)
+                    self.enemies.index.move(enemy)
+            else:
+                self.enemies.update(self.platforms, self.nav, player, dt)
+        with profiler.scope('projectiles.update'):
+            enemy_count = len(self.enemies)
+            view_left, view_right = self.projectile_bounds()
+            if self.batch is not None:
+                self.batch.update_projectiles(view_left, view_right, dt)
+            else:
+                self.projectiles.update(self.enemies, view_left, view_right, dt)
+            if len(self.enemies) < enemy_count:
+                player.events.append('hit')
+
+        events = player.events
+        player.events = []
+        if self.next_checkpoint < len(self.checkpoints) and player.rect.centerx >= self.checkpoints[self.next_checkpoint]:
+            self.next_checkpoint += 1
+            self.save_checkpoint()
+            events.append('checkpoint')
+        if self.level_end and pygame.sprite.collide_rect(player, self.level_end):
+            events.append('level_complete')
+        if player.lives <= 0:
+            events.append('game_over')
+        return events
+
+    def state_hash(self):
+        """Digest of everything the simulation evolves, for determinism checks"""
+        player = self.player
+        state = (
+            self.frame, tuple(player.rect), player.velocity_x, player.velocity_y, player.lives, player.coins,
+            player.jumping, player.double_jump_available, player.invincible_timer,
+            [(tuple(enemy.rect), enemy.direction) for enemy in self.enemies],
+            [tuple(coin.rect) for coin in self.coins],
+            [(tuple(projectile.rect), projectile.direction) for projectile in self.projectiles]
+        )
+        if self.streamer is not None:
+            removed_enemies, removed_coins, parked = self.streamer.capture()
+            state += (sorted(removed_enemies), sorted(removed_coins), sorted(parked.items()))
+        return hashlib.sha1(repr(state).encode('utf-8')).hexdigest()
+
+    def projectile_bounds(self):
+        """World x range projectiles live in: the camera view plus a margin, within the level"""
+        camera_x = self.player.camera_x
+        return (max(0, camera_x - PROJECTILE_CULL_MARGIN),
+                min(self.width, camera_x + WINDOW_WIDTH + PROJECTILE_CULL_MARGIN))
+
+    def save_checkpoint(self):
+        """Snapshot the current state as the point restart() returns to"""
+        self.checkpoint = LevelSnapshot(self)
+        return self.checkpoint
+
+    def restart(self):
+        """Rewind to the last checkpoint, or to the level start if none was reached"""
+        (self.checkpoint or self.initial).restore(self)
+
+    def progress(self):
+        """How far the player is towards the level end, from 0 to 1"""
+        if not self.level_end or self.level_end.rect.centerx <= 0:
+            return 0.0
+        return min(1.0, max(0.0, self.player.rect.centerx / self.level_end.rect.centerx))
+
+    def camera_x(self, alpha=1.0):
+        """Camera position blended between the last two steps"""
+        return self.prev_camera_x + (self.player.camera_x - self.prev_camera_x) * alpha
+
+    def player_pos(self, alpha=1.0):
+        """Player position blended between the last two steps"""
+        x0, y0 = self.prev_player_pos
+        return (x0 + (self.player.rect.x - x0) * alpha, y0 + (self.player.rect.y - y0) * alpha)
+
+class FixedStepClock:
+    """Turns variable frame times into a whole number of fixed simulation steps"""
+
+    def __init__(self, step=SIMULATION_STEP, max_frame_time=MAX_FRAME_TIME):
+        self.step = step
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """Add elapsed seconds and return how many steps are now due"""
+        self.accumulator += min(frame_time, self.max_frame_time)
+        # The epsilon keeps float rounding from deferring a step that is exactly due
+        steps = int(self.accumulator / self.step + 1e-9)
+        self.accumulator = max(0.0, self.accumulator - steps * self.step)
+        return steps
+
+    @property
+    def alpha(self):
+        """How far the display is between the last step and the next one"""
+        return self.accumulator / self.step
+
+    def reset(self):
+        self.accumulator = 0.0
+
+def init_headless():
+    """Switch SDL to the dummy video and audio drivers so worlds can step without a window"""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.display.quit()
+    pygame.display.init()
+
+def main():
+    from .level_manager import load_level
+
+    parser = argparse.ArgumentParser(description='Step a level headlessly as fast as possible')
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--frames', type=int, default=10000)
+    parser.add_argument('--batched', action='store_true', help='use the NumPy entity backend')
+    parser.add_argument('--rate', type=int, default=SIMULATION_RATE, help='simulation steps per second')
+    args = parser.parse_args()
+    if args.rate <= 0 or PHYSICS_RATE % args.rate:
+        parser.error(f'--rate must divide {PHYSICS_RATE}')
+
+    init_headless()
+    world = World(load_level(args.level), batched=args.batched, rate=args.rate)
+    inputs = InputState(right=True)
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        world.step(inputs)
+    elapsed = time.perf_counter() - start
+    print(f'{args.frames} steps in {elapsed:.3f}s ({args.frames / elapsed:.0f} steps/s)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+from bisect import bisect_right
+import pygame
+
+# Mutable per-class state a snapshot copies; images, frames and groups are shared and left alone
+ANIMATION_FIELDS = ('facing_right', 'anim_state', 'frame_index', 'frame_ticks')
+PLAYER_FIELDS = ANIMATION_FIELDS + (
+    'velocity_x', 'velocity_y', 'jumping', 'double_jump_available',
+    'lives', 'coins', 'camera_x', 'invincible', 'invincible_timer'
+)
+ENEMY_FIELDS = ANIMATION_FIELDS + ('speed', 'direction', 'enemy_type', 'start_x', 'patrol_distance')
+CHASER_FIELDS = ENEMY_FIELDS + ('velocity_y', 'ground', 'span')
+PROJECTILE_FIELDS = ('direction', 'speed')
+
+def _capture_sprite(sprite, fields):
+    return (sprite, tuple(sprite.rect), tuple(getattr(sprite, name) for name in fields))
+
+def _enemy_fields(enemy):
+    return ENEMY_FIELDS if enemy.batched else CHASER_FIELDS
+
+def _restore_sprite(entry, fields):
+    sprite, rect, values = entry
+    sprite.rect.update(rect)
+    for name, value in zip(fields, values):
+        setattr(sprite, name, value)
+    return sprite
+
+def _restore_group(group, entries, fields):
+    # Killed sprites must come back in their original order, so only then is the group rebuilt
+    sprites = [_restore_sprite(entry, fields(entry[0]) if callable(fields) else fields) for entry in entries]
+    if len(group) != len(sprites) or any(sprite not in group for sprite in sprites):
+        group.empty()
+        group.add(sprites)
+    elif hasattr(group, 'reindex'):
+        group.reindex()
+
+class LevelSnapshot:
+    """Copy of a World's mutable entity state that can be restored in place"""
+
+    def __init__(self, world):
+        player = world.player
+        self.frame = world.frame
+        self.next_checkpoint = world.next_checkpoint
+        self.player = _capture_sprite(player, PLAYER_FIELDS)
+        if world.streamer is not None:
+            # Streamed levels respawn their live chunks from compact deltas instead
+            self.stream_state = world.streamer.capture()
+            self.enemies = self.coins = None
+        else:
+            self.stream_state = None
+            self.enemies = [_capture_sprite(enemy, _enemy_fields(enemy)) for enemy in world.enemies]
+            self.coins = [_capture_sprite(coin, ()) for coin in world.coins]
+        self.projectiles = [_capture_sprite(projectile, PROJECTILE_FIELDS) for projectile in world.projectiles]
+
+    def members(self, group):
+        """Sprites captured from the 'enemies' or 'coins' group; none for streamed levels"""
+        entries = getattr(self, group)
+        return [entry[0] for entry in entries] if entries is not None else []
+
+    def edit_group(self, group, removed=(), placed=(), added=(), airborne=False):
+        """Apply a level edit to the captured 'enemies' or 'coins'
+
+        Removed sprites are dropped, placed ones re-captured at their new spawn
+        and added ones captured as they are. airborne clears the platform
+        chasers stood on, for when the platforms changed.
+        """
+        entries = getattr(self, group)
+        if entries is None:
+            return
+        fields = _enemy_fields if group == 'enemies' else lambda sprite: ()
+        removed = set(removed)
+        placed = set(placed)
+        edited = []
+        for entry in entries:
+            sprite = entry[0]
+            if sprite in removed:
+                continue
+            if sprite in placed:
+                entry = _capture_sprite(sprite, fields(sprite))
+            elif airborne and fields(sprite) is CHASER_FIELDS:
+                values = dict(zip(CHASER_FIELDS, entry[2]), ground=None, span=None)
+                entry = (sprite, entry[1], tuple(values[name] for name in CHASER_FIELDS))
+            edited.append(entry)
+        edited += [_capture_sprite(sprite, fields(sprite)) for sprite in added]
+        setattr(self, group, edited)
+
+    def edit_checkpoints(self, checkpoints):
+        """Count the edited checkpoints behind the captured player as reached"""
+        self.next_checkpoint = bisect_right(checkpoints, pygame.Rect(self.player[1]).centerx)
+
+    def restore(self, world):
+        """Rewind world to this snapshot, reusing every entity object"""
+        player = world.player
+        lives = player.lives
+        _restore_sprite(self.player, PLAYER_FIELDS)
+        if player.lives != lives:
+            player.update_hearts()
+        player.events = []
+        player.sync_image(force=True)
+
+        if self.stream_state is not None:
+            world.streamer.restore(self.stream_state, player.camera_x)
+        else:
+            _restore_group(world.enemies, self.enemies, _enemy_fields)
+            for enemy in world.enemies:
+                enemy.sync_image(force=True)
+            _restore_group(world.coins, self.coins, ())
+        _restore_group(world.projectiles, self.projectiles, PROJECTILE_FIELDS)
+        if world.batch is not None:
+            world.batch.invalidate()
+
+        world.frame = self.frame
+        world.next_checkpoint = self.next_checkpoint
+        world.prev_camera_x = player.camera_x
+        world.prev_player_pos = player.rect.topleft
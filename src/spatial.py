@@ -0,0 +1,217 @@
+import pygame
+from .settings import SPATIAL_CELL_SIZE, SPATIAL_MIN_ITEMS
+
+class SpatialHash:
+    """Uniform grid mapping cells to the objects whose rect overlaps them
+
+    Below min_items members a plain scan of every rect is faster than the grid,
+    so the grid is only built once the index grows past that size and dropped
+    again when it shrinks to half of it.
+    """
+
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE, min_items=SPATIAL_MIN_ITEMS):
+        self.cell_size = cell_size
+        self.min_items = min_items
+        self.cells = None  # cell -> objects filed there, None while scanning linearly
+        self._spans = {}  # obj -> cell range it is currently filed under
+        self._order = {}  # obj -> insertion counter, so queries keep group order
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, obj):
+        return obj in self._order
+
+    def insert(self, obj):
+        if obj in self._order:
+            self.remove(obj)
+        self._order[obj] = self._next_order
+        self._next_order += 1
+        if self.cells is not None:
+            self._file(obj)
+        elif len(self._order) >= self.min_items:
+            self._build()
+
+    def remove(self, obj):
+        if self._order.pop(obj, None) is None:
+            return
+        if self.cells is None:
+            return
+        for cell in self._iter_cells(self._spans.pop(obj)):
+            bucket = self.cells[cell]
+            del bucket[obj]
+            if not bucket:
+                del self.cells[cell]
+        if len(self._order) < self.min_items // 2:
+            self.cells = None
+            self._spans.clear()
+
+    def move(self, obj):
+        """Refile obj after its rect changed; cheap when it stays inside the same cells"""
+        old = self._spans.get(obj)
+        if old is None:
+            return
+        new = self._span(obj.rect)
+        if new == old:
+            return
+        self._spans[obj] = new
+        old_cells = set(self._iter_cells(old))
+        new_cells = set(self._iter_cells(new))
+        for cell in old_cells - new_cells:
+            bucket = self.cells[cell]
+            del bucket[obj]
+            if not bucket:
+                del self.cells[cell]
+        for cell in new_cells - old_cells:
+            self.cells.setdefault(cell, {})[obj] = None
+
+    def clear(self):
+        self.cells = None
+        self._spans.clear()
+        self._order.clear()
+
+    def query(self, rect):
+        """Objects whose rect collides with rect, in insertion order"""
+        colliderect = rect.colliderect
+        cells = self.cells
+        if cells is None:
+            # The order dict iterates in insertion order already
+            return [obj for obj in self._order if colliderect(obj.rect)]
+        size = self.cell_size
+        x0 = rect.left // size
+        y0 = rect.top // size
+        x1 = (rect.left + max(rect.width, 1) - 1) // size
+        y1 = (rect.top + max(rect.height, 1) - 1) // size
+        if x0 == x1 and y0 == y1:
+            found = cells.get((x0, y0), ())
+        else:
+            found = set()
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket:
+                        found.update(bucket)
+        hits = [obj for obj in found if colliderect(obj.rect)]
+        if len(hits) > 1:
+            hits.sort(key=self._order.__getitem__)
+        return hits
+
+    def _build(self):
+        # File every member; from here on inserts and moves keep the grid current
+        self.cells = {}
+        for obj in self._order:
+            self._file(obj)
+
+    def _file(self, obj):
+        span = self._span(obj.rect)
+        self._spans[obj] = span
+        for cell in self._iter_cells(span):
+            self.cells.setdefault(cell, {})[obj] = None
+
+    def iter_query(self, rect):
+        """Like query(), but re-queries if the caller moves rect between yields"""
+        last = -1
+        while True:
+            start = tuple(rect)
+            for obj in self.query(rect):
+                order = self._order[obj]
+                if order <= last:
+                    continue
+                last = order
+                yield obj
+                if tuple(rect) != start:
+                    break
+            else:
+                return
+
+    def _span(self, rect):
+        size = self.cell_size
+        return (
+            rect.left // size,
+            rect.top // size,
+            (rect.left + max(rect.width, 1) - 1) // size,
+            (rect.top + max(rect.height, 1) - 1) // size
+        )
+
+    @staticmethod
+    def _iter_cells(span):
+        x0, y0, x1, y1 = span
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield (cx, cy)
+
+class SpatialGroup(pygame.sprite.Group):
+    """Sprite group that keeps a SpatialHash of its members for broad-phase queries"""
+
+    def __init__(self, *sprites, cell_size=SPATIAL_CELL_SIZE, min_items=SPATIAL_MIN_ITEMS):
+        self.index = SpatialHash(cell_size, min_items)
+        self.version = 0  # Bumped whenever membership changes
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.index.insert(sprite)
+        self.version += 1
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.index.remove(sprite)
+        self.version += 1
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.reindex()
+
+    def reindex(self):
+        """Refile members that moved since the last call"""
+        if self.index.cells is None:
+            return  # Scanned linearly; nothing is filed
+        move = self.index.move
+        for sprite in self.spritedict:
+            move(sprite)
+
+    def colliding(self, rect):
+        """Members colliding with rect, in the same order iterating the group gives"""
+        return self.index.query(rect)
+
+    def iter_colliding(self, rect):
+        """Like colliding(), but re-queries if the caller moves rect between yields"""
+        return self.index.iter_query(rect)
+
+class SpatialList:
+    """Ordered, indexed collection of static collision objects that are not sprites"""
+
+    def __init__(self, items=(), cell_size=SPATIAL_CELL_SIZE, min_items=SPATIAL_MIN_ITEMS):
+        self.items = {}  # insertion-ordered set
+        self.index = SpatialHash(cell_size, min_items)
+        self.version = 0  # Bumped whenever membership or a member's rect changes
+        for item in items:
+            self.add(item)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        self.items[item] = None
+        self.index.insert(item)
+        self.version += 1
+
+    def remove(self, item):
+        del self.items[item]
+        self.index.remove(item)
+        self.version += 1
+
+    def move(self, item):
+        """Refile a member after its rect was changed"""
+        self.index.move(item)
+        self.version += 1
+
+    def colliding(self, rect):
+        return self.index.query(rect)
+
+    def iter_colliding(self, rect):
+        return self.index.iter_query(rect)
@@ -1,13 +1,62 @@
 import pygame
 import random
 from .settings import *
+from .assets import assets
+from .navigation import JUMP
+from .collision import swept_x, first_crossed_y, fall_distance, substeps
 
-class Player(pygame.sprite.Sprite):
-    def __init__(self, x, y):
+def load_frames(size, **states):
+    """Map (state, facing_right) to the shared frame surfaces of each animation state"""
+    frames = {}
+    for state, paths in states.items():
+        frames[(state, True)] = [assets.get_image(path, size) for path in paths]
+        frames[(state, False)] = [assets.get_image(path, size, flip=True) for path in paths]
+    return frames
+
+class AnimatedSprite(pygame.sprite.Sprite):
+    """Sprite that points image at a precomputed frame instead of transforming every update"""
+
+    def __init__(self, frames, state='idle'):
         super().__init__()
-        self.original_image = pygame.image.load('images/sonchi.png')
-        self.image = pygame.transform.scale(self.original_image, (PLAYER_WIDTH, PLAYER_HEIGHT))
+        self.frames = frames
+        self.anim_state = state
+        self.frame_index = 0
+        self.frame_ticks = 0
+        self.facing_right = True
+        self._frame_key = None
+        self.sync_image()
+
+    def animate(self, state, ticks=1):
+        """Advance the current animation by ticks base steps, restarting it when the state changes"""
+        if state != self.anim_state:
+            self.anim_state = state
+            self.frame_index = 0
+            self.frame_ticks = 0
+        elif len(self.frames[(state, True)]) > 1:
+            self.frame_ticks += ticks
+            if self.frame_ticks >= ANIMATION_FRAME_TICKS:
+                self.frame_ticks = 0
+                self.frame_index = (self.frame_index + 1) % len(self.frames[(state, True)])
+        self.sync_image()
+
+    def sync_image(self, force=False):
+        """Swap image only when facing or animation frame actually changed"""
+        key = (self.anim_state, self.facing_right, self.frame_index)
+        if force or key != self._frame_key:
+            self._frame_key = key
+            self.image = self.frames[(self.anim_state, self.facing_right)][self.frame_index]
+
+class Player(AnimatedSprite):
+    def __init__(self, x, y):
+        size = (PLAYER_WIDTH, PLAYER_HEIGHT)
+        super().__init__(load_frames(size, idle=['images/sonchi.png'], walk=['images/sonchi.png']))
         self.rect = self.image.get_rect()
+        self.hearts = pygame.sprite.Group()
+        self.level_width = LEVEL_WIDTH
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        """Put the player back to a fresh start at (x, y), reusing its images and groups"""
         self.rect.x = x
         self.rect.y = y
         self.velocity_x = 0
@@ -18,87 +67,97 @@ class Player(pygame.sprite.Sprite):
         self.lives = MAX_LIVES
         self.coins = 0
         self.camera_x = 0
-        self.hearts = pygame.sprite.Group()
         self.update_hearts()
         self.invincible = False
         self.invincible_timer = 0
+        self.events = []  # Sound-worthy things that happened since the last drain
+        self.anim_state = 'idle'
+        self.frame_index = 0
+        self.frame_ticks = 0
+        self.sync_image()
 
-    def update(self, platforms, projectiles, enemies, coins, level_end):
+    def update(self, platforms, projectiles, enemies, coins, level_end, inputs, dt=1):
+        """Advance dt base steps, one at a time so pickups and hits along the way count"""
         # Handle movement
-        keys = pygame.key.get_pressed()
         self.velocity_x = 0
-        if keys[pygame.K_LEFT]:
+        if inputs.left:
             self.velocity_x = -PLAYER_SPEED
             self.facing_right = False
-        if keys[pygame.K_RIGHT]:
+        if inputs.right:
             self.velocity_x = PLAYER_SPEED
             self.facing_right = True
 
-        # Apply velocity
-        self.rect.x += self.velocity_x
-        
-        # Apply gravity
-        self.velocity_y += GRAVITY
-        self.rect.y += self.velocity_y
-
-        # Check for collisions with platforms
-        on_ground = False
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                if self.velocity_y > 0:  # Falling
-                    self.rect.bottom = platform.rect.top
-                    self.velocity_y = 0
-                    self.jumping = False
-                    self.double_jump_available = True
-                    on_ground = True
-                elif self.velocity_y < 0:  # Jumping
-                    self.rect.top = platform.rect.bottom
-                    self.velocity_y = 0
+        # Positions round to whole pixels every base step, so a long step cannot be taken in one go
+        for _ in range(dt):
+            self.move(platforms, 1)
+            self.touch(enemies, coins, 1)
+            # Pick the frame for the current direction and movement
+            self.animate('walk' if self.velocity_x else 'idle')
 
+    def touch(self, enemies, coins, dt):
+        """Keep in bounds and follow with the camera, then take hits and pickups at the current position"""
         # Keep player in bounds
         if self.rect.left < 0:
             self.rect.left = 0
-        if self.rect.right > WINDOW_WIDTH * 3:  # Limit to level width
-            self.rect.right = WINDOW_WIDTH * 3
+        if self.rect.right > self.level_width:  # Limit to level width
+            self.rect.right = self.level_width
 
         # Update camera position
-        self.camera_x = max(0, min(self.rect.centerx - WINDOW_WIDTH // 2, WINDOW_WIDTH * 3 - WINDOW_WIDTH))
+        self.camera_x = max(0, min(self.rect.centerx - WINDOW_WIDTH // 2, self.level_width - WINDOW_WIDTH))
 
         # Handle invincibility
         if self.invincible:
-            self.invincible_timer -= 1
+            self.invincible_timer -= dt
             if self.invincible_timer <= 0:
                 self.invincible = False
 
         # Check for collisions with enemies
-        if not self.invincible:
-            for enemy in enemies:
-                if self.rect.colliderect(enemy.rect):
-                    self.take_damage()
-                    self.invincible = True
-                    self.invincible_timer = 60  # 1 second of invincibility
-                    break
+        if not self.invincible and enemies.colliding(self.rect):
+            self.take_damage()
+            self.invincible = True
+            self.invincible_timer = 60  # 1 second of invincibility
 
         # Check for collisions with coins
-        for coin in coins:
-            if self.rect.colliderect(coin.rect):
-                coin.kill()
-                self.coins += 1
-                pygame.mixer.Sound('sounds/coin.wav').play()
+        for coin in coins.colliding(self.rect):
+            coin.kill()
+            self.coins += 1
+            self.events.append('coin')
 
-        # Flip the image based on direction
-        if not self.facing_right:
-            self.image = pygame.transform.flip(pygame.transform.scale(self.original_image, (PLAYER_WIDTH, PLAYER_HEIGHT)), True, False)
-        else:
-            self.image = pygame.transform.scale(self.original_image, (PLAYER_WIDTH, PLAYER_HEIGHT))
+    def move(self, platforms, dt):
+        # Apply velocity
+        self.rect.x += self.velocity_x * dt
+        
+        # Apply gravity
+        self.velocity_y += GRAVITY * dt
+        start_y = self.rect.y
+        self.rect.y += fall_distance(self.velocity_y, dt)
+
+        # Check for collisions with platforms
+        hit = False
+        for platform in platforms.iter_colliding(self.rect):
+            hit = True
+            self.land_or_bump(platform)
+        if not hit:
+            # Nothing overlaps the end position, but a thin platform may lie inside the step
+            platform = first_crossed_y(platforms, self.rect, self.rect.y - start_y)
+            if platform is not None:
+                self.land_or_bump(platform)
+
+    def land_or_bump(self, platform):
+        if self.velocity_y > 0:  # Falling
+            self.rect.bottom = platform.rect.top
+            self.velocity_y = 0
+            self.jumping = False
+            self.double_jump_available = True
+        elif self.velocity_y < 0:  # Jumping
+            self.rect.top = platform.rect.bottom
+            self.velocity_y = 0
 
-    def shoot(self):
-        """Create a new projectile"""
+    def shoot(self, pool):
+        """Take a projectile from pool, or None when every slot is in flight"""
         if not self.facing_right:
-            projectile = Projectile(self.rect.centerx - 20, self.rect.centery, -1)
-        else:
-            projectile = Projectile(self.rect.centerx + 20, self.rect.centery, 1)
-        return projectile
+            return pool.acquire(self.rect.centerx - 20, self.rect.centery, -1)
+        return pool.acquire(self.rect.centerx + 20, self.rect.centery, 1)
 
     def update_hearts(self):
         self.hearts.empty()
@@ -109,6 +168,7 @@ class Player(pygame.sprite.Sprite):
     def take_damage(self):
         self.lives -= 1
         self.update_hearts()
+        self.events.append('hurt')
         return self.lives <= 0
 
     def jump(self):
@@ -116,30 +176,42 @@ class Player(pygame.sprite.Sprite):
             self.velocity_y = JUMP_FORCE
             self.jumping = True
             self.double_jump_available = True
-            pygame.mixer.Sound('sounds/jump.wav').play()
+            self.events.append('jump')
         elif self.double_jump_available:
             self.velocity_y = DOUBLE_JUMP_FORCE
             self.double_jump_available = False
-            pygame.mixer.Sound('sounds/jump.wav').play()
+            self.events.append('jump')
+
+class Enemy(AnimatedSprite):
+    batched = True  # Moved by the NumPy backend when it is enabled
+    navigates = False  # Needs the level's NavGraph
 
-class Enemy(pygame.sprite.Sprite):
     def __init__(self, x, y, enemy_type='basic'):
-        super().__init__()
-        self.original_image = pygame.image.load('images/boljanjac.png')
-        self.image = pygame.transform.scale(self.original_image, (ENEMY_SIZE, ENEMY_SIZE))
+        size = (ENEMY_SIZE, ENEMY_SIZE)
+        super().__init__(load_frames(size, walk=['images/boljanjac.png']), state='walk')
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
         self.speed = ENEMY_SPEED
         self.direction = 1
         self.enemy_type = enemy_type
-        self.facing_right = True
         self.start_x = x  # Store initial position
         self.patrol_distance = 300  # How far the enemy will patrol from start position
 
-    def update(self, platforms):
+    def place(self, x, y):
+        """Move to a new spawn point, patrolling around it from now on"""
+        self.rect.topleft = (x, y)
+        self.start_x = x
+
+    def update(self, platforms, nav=None, target=None, dt=1):
+        # Plain enemies patrol and ignore the navigation graph and the player
+        # Turns happen where a base step lands, so long steps patrol one base step at a time
+        for _ in range(dt):
+            self.patrol(platforms)
+
+    def patrol(self, platforms, dt=1):
         # Move horizontally
-        self.rect.x += self.speed * self.direction
+        self.rect.x += self.speed * self.direction * dt
         
         # Check patrol boundaries
         if self.rect.x < self.start_x - self.patrol_distance:
@@ -151,62 +223,233 @@ class Enemy(pygame.sprite.Sprite):
         
         # Check for platform edges
         on_platform = False
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                on_platform = True
-                # Check if at edge
-                if self.direction > 0 and self.rect.right >= platform.rect.right:
-                    self.direction = -1
-                    self.facing_right = False
-                elif self.direction < 0 and self.rect.left <= platform.rect.left:
-                    self.direction = 1
-                    self.facing_right = True
-                break
+        for platform in platforms.colliding(self.rect):
+            on_platform = True
+            # Check if at edge
+            if self.direction > 0 and self.rect.right >= platform.rect.right:
+                self.direction = -1
+                self.facing_right = False
+            elif self.direction < 0 and self.rect.left <= platform.rect.left:
+                self.direction = 1
+                self.facing_right = True
+            break
         
-        # Flip the image based on direction
-        if not self.facing_right:
-            self.image = pygame.transform.flip(pygame.transform.scale(self.original_image, (ENEMY_SIZE, ENEMY_SIZE)), True, False)
+        # Pick the frame for the current direction
+        self.animate('walk', dt)
+
+class Chaser(Enemy):
+    """Enemy under gravity that follows the player across platforms along the level's NavGraph"""
+    batched = False
+    navigates = True
+
+    def __init__(self, x, y, enemy_type='chaser'):
+        super().__init__(x, y, enemy_type)
+        self.velocity_y = 0
+        self.ground = None  # (left, right) of the platform it stands on, None while airborne
+        self.span = None  # NavGraph span of that platform
+
+    def place(self, x, y):
+        super().place(x, y)
+        self.velocity_y = 0
+        self.unground()
+
+    def unground(self):
+        """Forget the platform it stood on, so it lands afresh after the platforms changed"""
+        self.ground = self.span = None
+
+    def update(self, platforms, nav=None, target=None, dt=1):
+        if self.ground is None:
+            # Falls near platforms move in base steps, walking on once landed
+            pieces = substeps(platforms, self.rect, self.speed * self.direction * dt,
+                              fall_distance(self.velocity_y + GRAVITY * dt, dt), dt)
+            step = dt // pieces
+            for _ in range(pieces):
+                if self.ground is None:
+                    self.fall(platforms, nav, step)
+                else:
+                    self.walk(nav, target, step)
         else:
-            self.image = pygame.transform.scale(self.original_image, (ENEMY_SIZE, ENEMY_SIZE))
+            self.walk(nav, target, dt)
+        self.facing_right = self.direction > 0
+        self.animate('walk', dt)
+
+    def walk(self, nav, target, dt):
+        left, right = self.ground
+        goal = None
+        if nav is not None and target is not None:
+            goal = nav.span_under(target.rect.centerx, target.rect.bottom)
+        link = nav.next_link(self.span, goal) if goal is not None else None
+        if link is not None:
+            _, _, kind, takeoff, direction, _ = nav.link(link)
+            if abs(self.rect.x - takeoff) <= self.speed * dt:
+                # At the take-off point: jump, or step off toward the next span
+                self.rect.x = takeoff
+                self.direction = direction
+                if kind == JUMP:
+                    self.velocity_y = JUMP_FORCE
+                self.ground = self.span = None
+                return
+            self.direction = 1 if takeoff > self.rect.x else -1
+        elif goal is not None:
+            # Same platform as the player, or no way there: close in without leaving the platform
+            offset = target.rect.centerx - self.rect.centerx
+            if abs(offset) <= self.speed * dt:
+                return
+            self.direction = 1 if offset > 0 else -1
+            if self.at_edge(left, right, dt):
+                return
+        elif self.at_edge(left, right, dt):
+            # No player to chase: patrol the platform
+            self.direction = -self.direction
+
+        self.rect.x += self.speed * self.direction * dt
+        if self.rect.right <= left or self.rect.left >= right:
+            self.ground = self.span = None
+
+    def at_edge(self, left, right, dt=1):
+        # Another step in the current direction would leave the platform
+        if self.direction > 0:
+            return self.rect.right + self.speed * dt > right
+        return self.rect.left - self.speed * dt < left
+
+    def fall(self, platforms, nav, dt=1):
+        self.rect.x += self.speed * self.direction * dt
+        self.velocity_y += GRAVITY * dt
+        start_y = self.rect.y
+        self.rect.y += fall_distance(self.velocity_y, dt)
+        hit = False
+        for platform in platforms.iter_colliding(self.rect):
+            hit = True
+            self.land_or_bump(platform, nav)
+        if not hit:
+            platform = first_crossed_y(platforms, self.rect, self.rect.y - start_y)
+            if platform is not None:
+                self.land_or_bump(platform, nav)
+
+    def land_or_bump(self, platform, nav):
+        if self.velocity_y > 0:  # Falling
+            top = platform.rect.top
+            self.rect.bottom = top
+            self.velocity_y = 0
+            self.ground = (platform.rect.left, platform.rect.right)
+            if nav is not None:
+                x = min(max(self.rect.centerx, platform.rect.left), platform.rect.right - 1)
+                self.span = nav.span_under(x, top)
+        elif self.velocity_y < 0:  # Jumping
+            self.rect.top = platform.rect.bottom
+            self.velocity_y = 0
+
+# Enemy classes by level file type; unknown types are plain patrolling enemies
+ENEMY_TYPES = {'chaser': Chaser}
+
+def make_enemy(x, y, enemy_type='basic'):
+    return ENEMY_TYPES.get(enemy_type, Enemy)(x, y, enemy_type)
+
+def needs_navigation(enemy_types):
+    """Whether any of the enemy types path-find, so the level needs a NavGraph"""
+    return any(ENEMY_TYPES.get(enemy_type, Enemy).navigates for enemy_type in enemy_types)
 
 class Projectile(pygame.sprite.Sprite):
-    def __init__(self, x, y, direction):
+    """Bullet that returns to its ProjectilePool when killed; all instances share one image"""
+    _image = None
+
+    def __init__(self, x=0, y=0, direction=1, pool=None):
         super().__init__()
-        self.image = pygame.Surface((PROJECTILE_SIZE, PROJECTILE_SIZE))
-        self.image.fill(RED)
+        if Projectile._image is None:
+            Projectile._image = pygame.Surface((PROJECTILE_SIZE, PROJECTILE_SIZE))
+            Projectile._image.fill(RED)
+        self.image = Projectile._image
         self.rect = self.image.get_rect()
+        self.pool = pool
+        self.launch(x, y, direction)
+
+    def launch(self, x, y, direction):
+        """Reset a released projectile for another shot"""
         self.rect.center = (x, y)
         self.direction = direction
         self.speed = PROJECTILE_SPEED
+        return self
+
+    def kill(self):
+        was_alive = self.alive()
+        super().kill()
+        if was_alive and self.pool is not None:
+            self.pool.release(self)
 
-    def update(self, enemies):
+    def update(self, enemies, view_left, view_right, dt=1):
         # Move projectile
-        self.rect.x += self.speed * self.direction
+        dx = self.speed * self.direction * dt
+        self.rect.x += dx
         
-        # Check for collisions with enemies
-        hits = pygame.sprite.spritecollide(self, enemies, True)
+        # Check for collisions with enemies, including any it flew past this step
+        hits = enemies.colliding(swept_x(self.rect, dx))
+        for enemy in hits:
+            enemy.kill()
         if hits:
             self.kill()
             return
         
-        # Remove if off screen
-        if self.rect.right < 0 or self.rect.left > WINDOW_WIDTH:
+        # Remove once it leaves the camera view, which never extends past the level
+        if self.rect.right < view_left or self.rect.left > view_right:
             self.kill()
 
-class Platform(pygame.sprite.Sprite):
+class ProjectilePool:
+    """Fixed set of preallocated projectiles handed out and taken back instead of allocated per shot"""
+
+    def __init__(self, capacity=PROJECTILE_POOL_SIZE):
+        self.slots = [Projectile(pool=self) for _ in range(capacity)]
+        self.free = list(reversed(self.slots))
+        self.acquired = 0
+        self.dropped = 0
+        self.peak = 0
+
+    def acquire(self, x, y, direction):
+        """A launched projectile, or None when every slot is in flight"""
+        projectile = self._pop()
+        if projectile is None:
+            # Sprites dropped from their group without kill() (e.g. a snapshot restore) are free too
+            self.free = [p for p in reversed(self.slots) if not p.alive()]
+            projectile = self._pop()
+            if projectile is None:
+                self.dropped += 1
+                return None
+        self.acquired += 1
+        self.peak = max(self.peak, len(self.slots) - len(self.free))
+        return projectile.launch(x, y, direction)
+
+    def release(self, projectile):
+        self.free.append(projectile)
+
+    def stats(self):
+        in_use = sum(1 for projectile in self.slots if projectile.alive())
+        return {
+            'capacity': len(self.slots),
+            'in_use': in_use,
+            'free': len(self.slots) - in_use,
+            'peak': self.peak,
+            'acquired': self.acquired,
+            'dropped': self.dropped
+        }
+
+    def _pop(self):
+        # A restored snapshot can bring back a released projectile, so skip live ones
+        while self.free:
+            projectile = self.free.pop()
+            if not projectile.alive():
+                return projectile
+        return None
+
+class Platform:
+    """Static collision box; its pixels are baked into the level's StaticLayer"""
+    __slots__ = ('rect',)
+
     def __init__(self, x, y, width, height):
-        super().__init__()
-        self.image = pygame.Surface((width, height))
-        self.image.fill(GREEN)
-        self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
+        self.rect = pygame.Rect(x, y, width, height)
 
 class Coin(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
-        self.image = pygame.image.load('images/coin.png')
-        self.image = pygame.transform.scale(self.image, (COIN_SIZE, COIN_SIZE))
+        self.image = assets.get_image('images/coin.png', (COIN_SIZE, COIN_SIZE))
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
@@ -214,8 +457,7 @@ class Coin(pygame.sprite.Sprite):
 class LevelEnd(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
-        self.image = pygame.image.load('images/flag.png')
-        self.image = pygame.transform.scale(self.image, (50, 50))
+        self.image = assets.get_image('images/flag.png', (50, 50))
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
@@ -223,8 +465,18 @@ class LevelEnd(pygame.sprite.Sprite):
 class Heart(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
-        self.image = pygame.image.load('images/heart.png')
-        self.image = pygame.transform.scale(self.image, (30, 30))
+        self.image = assets.get_image('images/heart.png', (30, 30))
         self.rect = self.image.get_rect()
         self.rect.x = x
-        self.rect.y = y 
\ No newline at end of file
+        self.rect.y = y
+
+# Scaled and mirrored variants worth warming before the first level loads
+SPRITE_VARIANTS = [
+    ('images/sonchi.png', (PLAYER_WIDTH, PLAYER_HEIGHT), False),
+    ('images/sonchi.png', (PLAYER_WIDTH, PLAYER_HEIGHT), True),
+    ('images/boljanjac.png', (ENEMY_SIZE, ENEMY_SIZE), False),
+    ('images/boljanjac.png', (ENEMY_SIZE, ENEMY_SIZE), True),
+    ('images/coin.png', (COIN_SIZE, COIN_SIZE), False),
+    ('images/flag.png', (50, 50), False),
+    ('images/heart.png', (30, 30), False)
+]
@@ -0,0 +1,116 @@
+import pygame
+from .settings import WINDOW_WIDTH, GREEN, STATIC_COLORKEY
+from .assets import can_convert
+
+class StaticLayer:
+    """Level geometry baked once into screen-width chunks"""
+
+    def __init__(self, platforms=(), chunk_width=WINDOW_WIDTH, color=GREEN):
+        self.chunk_width = chunk_width
+        self.color = color
+        self.chunks = {}  # chunk column -> [(world rect, surface)] horizontal bands
+        self._scaled = {}  # (chunk column, scale) -> the column's band surfaces resized by scale
+        self._unconverted = set()
+        columns = {}
+        for platform in platforms:
+            rect = platform.rect
+            for column in range(rect.left // chunk_width, (rect.right - 1) // chunk_width + 1):
+                columns.setdefault(column, []).append(rect)
+        for column, rects in columns.items():
+            self.bake_column(column, rects)
+
+    @property
+    def converted(self):
+        return not self._unconverted
+
+    def bake_column(self, column, rects):
+        """Bake the parts of rects inside one chunk column, replacing what was there"""
+        bounds = pygame.Rect(column * self.chunk_width, 0, self.chunk_width, 1)
+        clips = []
+        for rect in rects:
+            clip = bounds.clip(pygame.Rect(rect.x, 0, rect.width, 1))
+            if clip.width:
+                clips.append(pygame.Rect(clip.x, rect.top, clip.width, rect.height))
+        self.chunks[column] = [self._bake(band, self.color) for band in self._bands(clips)]
+        self._drop_scaled(column)
+        self._unconverted.add(column)
+        if can_convert():
+            self.convert()
+
+    def drop_column(self, column):
+        self.chunks.pop(column, None)
+        self._drop_scaled(column)
+        self._unconverted.discard(column)
+
+    def _drop_scaled(self, column):
+        for key in [key for key in self._scaled if key[0] == column]:
+            del self._scaled[key]
+
+    def convert(self):
+        """Convert new bands to the display format; must run on the main thread"""
+        for column in self._unconverted:
+            converted = []
+            for area, surface in self.chunks[column]:
+                surface = surface.convert()
+                surface.set_colorkey(STATIC_COLORKEY, pygame.RLEACCEL)
+                converted.append((area, surface))
+            self.chunks[column] = converted
+            self._drop_scaled(column)
+        self._unconverted.clear()
+
+    @staticmethod
+    def _bands(rects):
+        # Rects that overlap vertically share a band; empty rows between them are never stored
+        bands = []
+        bottom = None
+        for rect in sorted(rects, key=lambda r: r.top):
+            if bands and rect.top < bottom:
+                bands[-1].append(rect)
+                bottom = max(bottom, rect.bottom)
+            else:
+                bands.append([rect])
+                bottom = rect.bottom
+        return bands
+
+    @staticmethod
+    def _bake(rects, color):
+        area = rects[0].unionall(rects[1:])
+        surface = pygame.Surface(area.size)
+        surface.fill(STATIC_COLORKEY)
+        for rect in rects:
+            surface.fill(color, rect.move(-area.x, -area.y))
+        surface.set_colorkey(STATIC_COLORKEY, pygame.RLEACCEL)
+        return area, surface
+
+    def visible(self, view, scale=1):
+        """(world rect, surface) pairs of the baked bands overlapping view, surfaces resized by scale"""
+        first = view.left // self.chunk_width
+        last = (view.right - 1) // self.chunk_width
+        found = []
+        for column in range(first, last + 1):
+            bands = self.chunks.get(column, ())
+            surfaces = self._scaled_bands(column, bands, scale) if scale != 1 and bands else None
+            for index, (area, surface) in enumerate(bands):
+                if area.colliderect(view):
+                    found.append((area, surface if surfaces is None else surfaces[index]))
+        return found
+
+    def _scaled_bands(self, column, bands, scale):
+        surfaces = self._scaled.get((column, scale))
+        if surfaces is None:
+            surfaces = []
+            for area, surface in bands:
+                size = (max(1, round(area.width * scale)), max(1, round(area.height * scale)))
+                # Nearest-neighbour keeps the colorkey exact at the edges
+                copy = pygame.transform.scale(surface, size)
+                copy.set_colorkey(STATIC_COLORKEY, pygame.RLEACCEL)
+                surfaces.append(copy)
+            self._scaled[(column, scale)] = surfaces
+        return surfaces
+
+    def __len__(self):
+        return sum(len(bands) for bands in self.chunks.values())
+
+    def memory_bytes(self):
+        return sum(surface.get_pitch() * surface.get_height()
+                   for bands in self.chunks.values() for _, surface in bands)
@@ -0,0 +1,369 @@
+from collections import OrderedDict
+from .settings import WINDOW_WIDTH, STREAM_MARGIN_CHUNKS, STREAM_CACHE_CHUNKS
+from .sprites import Platform, Coin, make_enemy, needs_navigation
+
+class ChunkData:
+    """Decoded spawn records of one chunk, keyed by their number in the level arrays"""
+    __slots__ = ('platforms', 'enemies', 'coins')
+
+    def __init__(self, compiled, chunk):
+        platform_refs, enemy_refs, coin_refs = compiled.chunk_members(chunk)
+        p, e, c = compiled.platforms, compiled.enemies, compiled.coins
+        types = compiled.enemy_types
+        self.platforms = [(n, p[n * 4], p[n * 4 + 1], p[n * 4 + 2], p[n * 4 + 3]) for n in platform_refs]
+        self.enemies = [(n, e[n * 3], e[n * 3 + 1], types[e[n * 3 + 2]]) for n in enemy_refs]
+        self.coins = [(n, c[n * 2], c[n * 2 + 1]) for n in coin_refs]
+
+    def renumber(self, platforms, enemies, coins):
+        """Follow RecordDiffs that left every record of this chunk in place"""
+        self.platforms = sorted((platforms.matches[n], *record) for n, *record in self.platforms)
+        self.enemies = sorted((enemies.matches[n], *record) for n, *record in self.enemies)
+        self.coins = sorted((coins.matches[n], *record) for n, *record in self.coins)
+
+class LevelStreamer:
+    """Keeps only the chunks around the camera live, parking the rest as compact deltas"""
+
+    def __init__(self, compiled, platforms, static_layer, enemies, coins,
+                 margin=STREAM_MARGIN_CHUNKS, cache_size=STREAM_CACHE_CHUNKS):
+        self.compiled = compiled
+        self.chunk_width = compiled.chunk_width
+        self.chunk_count = compiled.chunk_count
+        self.platforms = platforms
+        self.static_layer = static_layer
+        self.enemies = enemies
+        self.coins = coins
+        self.margin = margin
+        self.cache_size = cache_size
+        self.active = {}  # chunk -> (enemy sprites, coin sprites) spawned for it
+        self.removed_enemies = set()  # numbers of enemies killed while their chunk was live
+        self.removed_coins = set()
+        self.enemy_state = {}  # enemy number -> (rect, direction, facing_right) when parked; chasers respawn airborne
+        self.roamers = {}  # number -> chunk, for navigating enemies filed away from the chunk they spawn in
+        self._platform_refs = {}  # platform number -> [Platform, live chunks using it]
+        self._cache = OrderedDict()  # chunk -> ChunkData, least recently used first
+        self.loads = 0
+        self.evictions = 0
+
+    def window(self, camera_x):
+        """(first, last) chunk kept live with the camera at camera_x"""
+        first = max(0, int(camera_x) // self.chunk_width - self.margin)
+        last = min(self.chunk_count - 1, (int(camera_x) + WINDOW_WIDTH - 1) // self.chunk_width + self.margin)
+        return first, last
+
+    def update(self, camera_x):
+        """Activate chunks entering the camera window and park the ones that left it"""
+        first, last = self.window(camera_x)
+        for chunk in range(first, last + 1):
+            if chunk not in self.active:
+                self._activate(chunk)
+        leaving = [chunk for chunk in self.active if not first <= chunk <= last]
+        if leaving:
+            # Enemies that followed the player stay live with the chunk they are in now
+            self._refile()
+            for chunk in leaving:
+                self._deactivate(chunk)
+
+    def capture(self):
+        """Removed sets and parked enemy state as if every live chunk were parked now"""
+        removed_enemies = set(self.removed_enemies)
+        removed_coins = set(self.removed_coins)
+        enemy_state = dict(self.enemy_state)
+        for enemies, coins in self.active.values():
+            self._park(enemies, coins, removed_enemies, removed_coins, enemy_state)
+        return removed_enemies, removed_coins, enemy_state
+
+    def restore(self, state, camera_x):
+        """Drop every live chunk and respawn around camera_x from a capture()"""
+        for chunk in list(self.active):
+            self._deactivate(chunk, park=False)
+        removed_enemies, removed_coins, enemy_state = state
+        self.removed_enemies = set(removed_enemies)
+        self.removed_coins = set(removed_coins)
+        self.enemy_state = dict(enemy_state)
+        self._file_roamers()
+        self.update(camera_x)
+
+    def stats(self):
+        return {
+            'active_chunks': len(self.active),
+            'cached_chunks': len(self._cache),
+            'loads': self.loads,
+            'evictions': self.evictions,
+            'live_platforms': len(self._platform_refs)
+        }
+
+    def _chunk(self, chunk):
+        data = self._cache.get(chunk)
+        if data is not None:
+            self._cache.move_to_end(chunk)
+            return data
+        # Reading the records touches the memory-mapped file, so only chunks in use hit the disk
+        data = ChunkData(self.compiled, chunk)
+        self.loads += 1
+        self._cache[chunk] = data
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return data
+
+    def reload(self, compiled, platforms, enemies, coins):
+        """Switch to an edited compile of the level, keeping every live sprite whose record survived
+
+        platforms, enemies and coins are hot_reload.RecordDiffs from the current
+        records to compiled's. Sprites of removed records go, moved ones jump to
+        their new spawn, and new records inside live chunks spawn; only the
+        chunks an edited record was or is filed under are decoded and re-baked.
+        """
+        # Chunks past the new end are parked while the old layout still describes them
+        for chunk in [chunk for chunk in self.active if chunk >= compiled.chunk_count]:
+            self._deactivate(chunk)
+        touched = self._touched(compiled, platforms, enemies, coins)
+        # Edited live chunks let go of their platforms under the old numbers and take them up again below
+        for chunk in touched.intersection(self.active):
+            for number, *_ in self._chunk(chunk).platforms:
+                self._platform_refs[number][1] -= 1
+        self.removed_enemies, self.removed_coins, self.enemy_state = self.remap_state(
+            (self.removed_enemies, self.removed_coins, self.enemy_state), enemies, coins)
+        self.compiled = compiled
+        self.chunk_count = compiled.chunk_count
+        # Cached chunks nobody edited keep their records under the new numbers
+        cache = OrderedDict()
+        for chunk, data in self._cache.items():
+            if chunk not in touched:
+                data.renumber(platforms, enemies, coins)
+                cache[chunk] = data
+        self._cache = cache
+
+        # Live platforms keep their objects under their new numbers
+        refs = {}
+        p = compiled.platforms
+        for number, ref in self._platform_refs.items():
+            new = platforms.matches[number]
+            if new is None:
+                self.platforms.remove(ref[0])
+                continue
+            if number in platforms.moved:
+                ref[0].rect.update(p[new * 4:new * 4 + 4].tolist())
+                self.platforms.move(ref[0])
+            refs[new] = ref
+        self._platform_refs = refs
+
+        # Sprites of untouched chunks stay where they are; the rest are matched to the new records below
+        pooled_enemies, pooled_coins = [], []
+        for chunk, (chunk_enemies, chunk_coins) in self.active.items():
+            if chunk in touched:
+                pooled_enemies += chunk_enemies
+                pooled_coins += chunk_coins
+                self.active[chunk] = ([], [])
+                continue
+            # Killed sprites become removed records; a chaser filed away from its spawn may have had its record edited
+            kept_enemies = []
+            for enemy in chunk_enemies:
+                if self.enemies.has(enemy) and enemy.spawn_id not in enemies.moved and \
+                        enemies.matches[enemy.spawn_id] is not None:
+                    enemy.spawn_id = enemies.matches[enemy.spawn_id]
+                    kept_enemies.append(enemy)
+                else:
+                    pooled_enemies.append(enemy)
+            kept_coins = []
+            for coin in chunk_coins:
+                if self.coins.has(coin):
+                    coin.spawn_id = coins.matches[coin.spawn_id]
+                    kept_coins.append(coin)
+                else:
+                    pooled_coins.append(coin)
+            self.active[chunk] = (kept_enemies, kept_coins)
+
+        # Likewise for live sprites; ones killed meanwhile become removed records
+        live_enemies = self._renumber(pooled_enemies, self.enemies, enemies, self.removed_enemies,
+                                      lambda enemy, number: enemy.place(compiled.enemies[number * 3],
+                                                                        compiled.enemies[number * 3 + 1]))
+        live_coins = self._renumber(pooled_coins, self.coins, coins, self.removed_coins,
+                                    lambda coin, number: setattr(coin.rect, 'topleft', (compiled.coins[number * 2],
+                                                                                        compiled.coins[number * 2 + 1])))
+        self._file_roamers()
+
+        # Refill the edited live chunks from the new records, spawning only what no live sprite covers
+        for chunk in sorted(touched.intersection(self.active)):
+            data = self._chunk(chunk)
+            self.static_layer.bake_column(chunk, [self._ref_platform(*record) for record in data.platforms])
+            chunk_enemies = []
+            for number, x, y, enemy_type in data.enemies:
+                enemy = live_enemies.pop(number, None)
+                if enemy is None:
+                    if number in self.removed_enemies or number in self.roamers:
+                        continue
+                    enemy = self._spawn_enemy(number, x, y, enemy_type)
+                    self.enemies.add(enemy)
+                chunk_enemies.append(enemy)
+            chunk_coins = []
+            for number, x, y in data.coins:
+                coin = live_coins.pop(number, None)
+                if coin is None:
+                    if number in self.removed_coins:
+                        continue
+                    coin = self._spawn_coin(number, x, y)
+                    self.coins.add(coin)
+                chunk_coins.append(coin)
+            self.active[chunk] = (chunk_enemies, chunk_coins)
+        # Live roamers whose spawn chunk is parked stay with the live chunk they are in
+        for number, enemy in list(live_enemies.items()):
+            chunk = self._chunk_of(enemy.rect.x)
+            if enemy.navigates and chunk in self.active:
+                self.active[chunk][0].append(enemy)
+                self.roamers[number] = chunk
+                del live_enemies[number]
+        self._refile()
+
+        # Sprites whose record moved into a parked chunk are parked with it
+        self._park(live_enemies.values(), live_coins.values(), self.removed_enemies, self.removed_coins, self.enemy_state)
+        self.enemies.remove(list(live_enemies.values()))
+        self.coins.remove(list(live_coins.values()))
+        for number in [number for number, ref in self._platform_refs.items() if ref[1] == 0]:
+            self.platforms.remove(self._platform_refs.pop(number)[0])
+
+    def _touched(self, compiled, platforms, enemies, coins):
+        # Chunks an edited record is filed under, before or after the edit
+        if compiled.chunk_count != self.chunk_count:
+            # The last chunk also holds everything past the end, so the filing moved
+            return set(range(max(compiled.chunk_count, self.chunk_count)))
+        touched = set()
+        for diff, stride, name in ((platforms, 4, 'platforms'), (enemies, 3, 'enemies'), (coins, 2, 'coins')):
+            old, new = getattr(self.compiled, name), getattr(compiled, name)
+            edits = [(old, number) for number in (*diff.moved, *diff.removed)]
+            edits += [(new, diff.matches[number]) for number in diff.moved] + [(new, number) for number in diff.added]
+            for ints, number in edits:
+                x = ints[number * stride]
+                # Platforms are filed under every chunk they overlap, spawns under the one they start in
+                right = x + max(ints[number * stride + 2], 1) - 1 if stride == 4 else x
+                touched.update(range(self._chunk_of(x), self._chunk_of(right) + 1))
+        return touched
+
+    def remap_state(self, state, enemies, coins):
+        """A capture() renumbered through RecordDiffs; enemies whose record moved lose their parked state"""
+        removed_enemies, removed_coins, enemy_state = state
+        return (
+            {enemies.matches[number] for number in removed_enemies if enemies.matches[number] is not None},
+            {coins.matches[number] for number in removed_coins if coins.matches[number] is not None},
+            {enemies.matches[number]: parked for number, parked in enemy_state.items()
+             if enemies.matches[number] is not None and number not in enemies.moved}
+        )
+
+    def _renumber(self, sprites, group, diff, removed, place):
+        # Live sprites by new record number; sprites of removed records leave the group
+        live = {}
+        for sprite in sprites:
+            new = diff.matches[sprite.spawn_id]
+            if new is None:
+                group.remove(sprite)
+                continue
+            moved = sprite.spawn_id in diff.moved
+            sprite.spawn_id = new
+            if not group.has(sprite):
+                removed.add(new)
+                continue
+            if moved:
+                place(sprite, new)
+                group.index.move(sprite)
+            live[new] = sprite
+        return live
+
+    def _chunk_of(self, x):
+        # Same filing as the level compiler's
+        return min(max(int(x) // self.chunk_width, 0), self.chunk_count - 1)
+
+    def _home(self, number):
+        return self._chunk_of(self.compiled.enemies[number * 3])
+
+    def _file_roamers(self):
+        # Parked navigating enemies belong to the chunk they were parked in, live ones to the one holding them
+        types = self.compiled.enemy_types
+        self.roamers = {}
+        for number, (rect, _, _) in self.enemy_state.items():
+            if needs_navigation([types[self.compiled.enemies[number * 3 + 2]]]):
+                chunk = self._chunk_of(rect[0])
+                if chunk != self._home(number):
+                    self.roamers[number] = chunk
+        for chunk, (enemies, _) in self.active.items():
+            for enemy in enemies:
+                if enemy.navigates and chunk != self._home(enemy.spawn_id):
+                    self.roamers[enemy.spawn_id] = chunk
+
+    def _refile(self):
+        # Move navigating enemies to the live chunk they stand in, so they park and return with it
+        for chunk, (enemies, _) in self.active.items():
+            for enemy in [enemy for enemy in enemies if enemy.navigates]:
+                here = self._chunk_of(enemy.rect.x)
+                if here == chunk or here not in self.active:
+                    continue
+                enemies.remove(enemy)
+                self.active[here][0].append(enemy)
+                if here == self._home(enemy.spawn_id):
+                    self.roamers.pop(enemy.spawn_id, None)
+                else:
+                    self.roamers[enemy.spawn_id] = here
+
+    def _ref_platform(self, number, x, y, width, height):
+        ref = self._platform_refs.get(number)
+        if ref is None:
+            ref = self._platform_refs[number] = [Platform(x, y, width, height), 0]
+            self.platforms.add(ref[0])
+        ref[1] += 1
+        return ref[0].rect
+
+    def _spawn_enemy(self, number, x, y, enemy_type):
+        enemy = make_enemy(x, y, enemy_type)
+        enemy.spawn_id = number
+        parked = self.enemy_state.pop(number, None)
+        if parked is not None:
+            rect, enemy.direction, enemy.facing_right = parked
+            enemy.rect.update(rect)
+            enemy.sync_image()
+        return enemy
+
+    def _spawn_coin(self, number, x, y):
+        coin = Coin(x, y)
+        coin.spawn_id = number
+        return coin
+
+    def _activate(self, chunk):
+        data = self._chunk(chunk)
+        self.static_layer.bake_column(chunk, [self._ref_platform(*record) for record in data.platforms])
+        enemies = [self._spawn_enemy(number, x, y, enemy_type) for number, x, y, enemy_type in data.enemies
+                   if number not in self.removed_enemies and number not in self.roamers]
+        e, types = self.compiled.enemies, self.compiled.enemy_types
+        enemies += [self._spawn_enemy(number, e[number * 3], e[number * 3 + 1], types[e[number * 3 + 2]])
+                    for number, roamed_to in self.roamers.items() if roamed_to == chunk]
+        coins = [self._spawn_coin(number, x, y) for number, x, y in data.coins if number not in self.removed_coins]
+        self.enemies.add(enemies)
+        self.coins.add(coins)
+        self.active[chunk] = (enemies, coins)
+
+    def _deactivate(self, chunk, park=True):
+        enemies, coins = self.active.pop(chunk)
+        if park:
+            self._park(enemies, coins, self.removed_enemies, self.removed_coins, self.enemy_state)
+        self.enemies.remove(enemies)
+        self.coins.remove(coins)
+
+        data = self._chunk(chunk)
+        for number, *_ in data.platforms:
+            ref = self._platform_refs[number]
+            ref[1] -= 1
+            if ref[1] == 0:
+                self.platforms.remove(ref[0])
+                del self._platform_refs[number]
+        self.static_layer.drop_column(chunk)
+
+    def _park(self, enemies, coins, removed_enemies, removed_coins, enemy_state):
+        # A sprite no longer in its group was killed or collected while live
+        for enemy in enemies:
+            if self.enemies.has(enemy):
+                enemy_state[enemy.spawn_id] = (tuple(enemy.rect), enemy.direction, enemy.facing_right)
+            else:
+                removed_enemies.add(enemy.spawn_id)
+                if removed_enemies is self.removed_enemies:
+                    self.roamers.pop(enemy.spawn_id, None)
+        for coin in coins:
+            if not self.coins.has(coin):
+                removed_coins.add(coin.spawn_id)
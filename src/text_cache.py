@@ -0,0 +1,36 @@
+from collections import OrderedDict
+from .settings import TEXT_CACHE_SIZE
+
+class TextCache:
+    """Rendered text surfaces keyed by (text, font, color), evicting the least recently used"""
+
+    def __init__(self, capacity=TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, font, color):
+        """Return the shared antialiased surface for text, rendering it on first use"""
+        key = (text, font, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self._surfaces[key] = font.render(text, True, color)
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._surfaces)}
+
+# Shared cache used by the HUD and menus
+text_cache = TextCache()
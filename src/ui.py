@@ -1,8 +1,9 @@
 import pygame
 from .settings import (
-    WINDOW_WIDTH, WINDOW_HEIGHT, BLUE, WHITE, BLACK,
-    FONT
+    WINDOW_WIDTH, WINDOW_HEIGHT, BLUE, WHITE, BLACK, STATUS_MESSAGE_MS
 )
+from .runtime import get_font
+from .text_cache import text_cache
 
 class Button:
     def __init__(self, x, y, width, height, text, action=None):
@@ -12,82 +13,143 @@ class Button:
         self.color = (100, 100, 100)  # Default gray color
         self.hover_color = (150, 150, 150)  # Lighter gray for hover
         self.text_color = WHITE
-        self.font = FONT
+        self.font = None  # None uses the shared font
+        self.hovered = False
 
     def draw(self, surface):
         # Draw button background
-        color = self.hover_color if self.rect.collidepoint(pygame.mouse.get_pos()) else self.color
+        self.hovered = bool(self.rect.collidepoint(pygame.mouse.get_pos()))
+        color = self.hover_color if self.hovered else self.color
         pygame.draw.rect(surface, color, self.rect)
         pygame.draw.rect(surface, WHITE, self.rect, 2)  # White border
-        
+
         # Draw button text
-        text_surface = self.font.render(self.text, True, self.text_color)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        surface.blit(text_surface, text_rect)
+        blit_centered(surface, self.text, self.rect.center, self.font, self.text_color)
 
     def is_clicked(self, pos):
         return self.rect.collidepoint(pos)
 
+    def handle_event(self, event):
+        """Whether event is a left click on this button"""
+        return event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.is_clicked(event.pos)
+
+class HudText:
+    """One line of HUD text that re-renders only when its value changes"""
+
+    def __init__(self, template, pos, font=None, color=WHITE):
+        self.template = template
+        self.pos = pos
+        self.font = font
+        self.color = color
+        self.value = None
+        self.image = None
+
+    def draw(self, surface, value):
+        if self.image is None or value != self.value:
+            self.value = value
+            self.image = text_cache.render(self.template.format(value), self.font or get_font(), self.color)
+        surface.blit(self.image, self.pos)
+
+class StaticScreen:
+    """Menu or overlay screen drawn in full once, then only where a button's hover state changed"""
+
+    def __init__(self, draw, buttons=()):
+        self.draw_full = draw
+        self.buttons = buttons
+        self.valid = False
+
+    def invalidate(self):
+        self.valid = False
+
+    def draw(self, surface):
+        """Bring surface up to date; returns the changed rects, or None if all of it changed"""
+        if not self.valid:
+            self.draw_full(surface)
+            self.valid = True
+            return None
+        pos = pygame.mouse.get_pos()
+        dirty = []
+        for button in self.buttons:
+            if button.hovered != bool(button.rect.collidepoint(pos)):
+                button.draw(surface)
+                dirty.append(button.rect)
+        return dirty
+
+def blit_centered(surface, text, center, font=None, color=WHITE):
+    """Blit cached text centered on center"""
+    image = text_cache.render(text, font or get_font(), color)
+    surface.blit(image, (center[0] - image.get_width() // 2, center[1] - image.get_height() // 2))
+
+# HUD widgets and the dimming overlay are created once and reused every frame
+_coins_text = HudText('Coins: {}', (WINDOW_WIDTH - 150, 10))
+_level_text = HudText('Level {}', (WINDOW_WIDTH // 2 - 50, 10))
+_status_text = HudText('{}', (10, WINDOW_HEIGHT - 40))
+_status = None  # (message, ticks it was shown at)
+_overlay = None
+
+def _dim(screen):
+    # Draw semi-transparent overlay
+    global _overlay
+    if _overlay is None:
+        _overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        _overlay.set_alpha(128)
+        _overlay.fill(BLACK)
+    screen.blit(_overlay, (0, 0))
+
+def show_status(message):
+    """Show a one-line message at the bottom of the HUD for STATUS_MESSAGE_MS"""
+    global _status
+    _status = (message, pygame.time.get_ticks())
+
+def draw_hud(screen, coins, level):
+    global _status
+    _coins_text.draw(screen, coins)
+    _level_text.draw(screen, level)
+    if _status is not None:
+        message, shown = _status
+        if pygame.time.get_ticks() - shown < STATUS_MESSAGE_MS:
+            _status_text.draw(screen, message)
+        else:
+            _status = None
+
 def draw_menu(screen, buttons):
     # Draw background
     screen.fill(BLUE)
-    
+
     # Draw title
-    title = FONT.render("Sonchi's Adventure", True, WHITE)
-    title_rect = title.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//4))
-    screen.blit(title, title_rect)
-    
+    blit_centered(screen, "Sonchi's Adventure", (WINDOW_WIDTH//2, WINDOW_HEIGHT//4))
+
     # Draw buttons
     for button in buttons:
         button.draw(screen)
 
-def draw_pause_menu(screen):
-    # Draw semi-transparent overlay
-    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-    overlay.set_alpha(128)
-    overlay.fill(BLACK)
-    screen.blit(overlay, (0, 0))
-    
+def draw_pause_menu(screen, buttons=()):
+    _dim(screen)
+
     # Draw pause text
-    pause_text = FONT.render("PAUSED", True, WHITE)
-    pause_rect = pause_text.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
-    screen.blit(pause_text, pause_rect)
-    
+    blit_centered(screen, "PAUSED", (WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
+
     # Draw continue text
-    continue_text = FONT.render("Press ESC to continue", True, WHITE)
-    continue_rect = continue_text.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 50))
-    screen.blit(continue_text, continue_rect)
+    blit_centered(screen, "Press ESC to continue", (WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 50))
+
+    # Draw buttons
+    for button in buttons:
+        button.draw(screen)
 
 def draw_game_over(screen):
-    # Draw semi-transparent overlay
-    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-    overlay.set_alpha(128)
-    overlay.fill(BLACK)
-    screen.blit(overlay, (0, 0))
-    
+    _dim(screen)
+
     # Draw game over text
-    game_over_text = FONT.render("GAME OVER", True, WHITE)
-    game_over_rect = game_over_text.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
-    screen.blit(game_over_text, game_over_rect)
-    
+    blit_centered(screen, "GAME OVER", (WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
+
     # Draw restart text
-    restart_text = FONT.render("Press ENTER to restart", True, WHITE)
-    restart_rect = restart_text.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 50))
-    screen.blit(restart_text, restart_rect)
+    blit_centered(screen, "Press ENTER to restart", (WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 50))
 
 def draw_level_complete(screen):
-    # Draw semi-transparent overlay
-    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-    overlay.set_alpha(128)
-    overlay.fill(BLACK)
-    screen.blit(overlay, (0, 0))
-    
+    _dim(screen)
+
     # Draw level complete text
-    complete_text = FONT.render("LEVEL COMPLETE!", True, WHITE)
-    complete_rect = complete_text.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
-    screen.blit(complete_text, complete_rect)
-    
+    blit_centered(screen, "LEVEL COMPLETE!", (WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
+
     # Draw continue text
-    continue_text = FONT.render("Press ENTER to continue", True, WHITE)
-    continue_rect = continue_text.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 50))
-    screen.blit(continue_text, continue_rect) 
\ No newline at end of file
+    blit_centered(screen, "Press ENTER to continue", (WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 50))
\ No newline at end of file